@@ -0,0 +1,107 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import zstandard
+
+from data_extraction.archive_data import ArchiveData
+from data_extraction.ticker_index import TickerIndex
+from benchmark.synthetic_corpus import SyntheticCorpus
+from benchmark.ticker_match_benchmark import NASDAQ_PATH, OTC_PATH
+
+
+# Wanted subreddits are a small share of a dump, as in Pushshift dumps
+SUBREDDITS = ["stocks", "wallstreetbets"]
+OTHER_SUBREDDITS = ["pics", "news", "gaming", "funny", "askreddit", "movies"]
+
+
+def write_dumps(directory: str, num_files: int, comments_per_file: int) -> tuple:
+    """Write pairs of RS and RC dump files of a synthetic corpus
+
+    Args:
+        directory (str): directory to write files into
+        num_files (int): number of monthly file pairs
+        comments_per_file (int): number of comments per RC file
+
+    Returns:
+        tuple: list of RS paths and list of RC paths
+    """
+    rng = random.Random(0)
+    corpus = SyntheticCorpus.from_files([NASDAQ_PATH, OTC_PATH])
+    compressor = zstandard.ZstdCompressor(level=3)
+    submission_paths, comment_paths = [], []
+    for month in range(num_files):
+        submissions = corpus.create_submissions(comments_per_file)
+        submission_path = os.path.join(directory, "RS_2021-{:02d}.zst".format(month))
+        comment_path = os.path.join(directory, "RC_2021-{:02d}.zst".format(month))
+        with open(submission_path, "wb") as submission_file, open(
+            comment_path, "wb"
+        ) as comment_file:
+            submission_writer = compressor.stream_writer(submission_file)
+            comment_writer = compressor.stream_writer(comment_file)
+            for submission in submissions:
+                subreddit = rng.choice(SUBREDDITS + OTHER_SUBREDDITS * 3)
+                line = {
+                    "id": submission.id,
+                    "subreddit": subreddit,
+                    "title": submission.title,
+                    "author": submission.author,
+                    "selftext": submission.selftext,
+                    "score": submission.score,
+                    "created_utc": submission.created_utc,
+                }
+                submission_writer.write((json.dumps(line) + "\n").encode("utf-8"))
+                for comment in submission.comments.list():
+                    line = {
+                        "id": comment.id,
+                        "subreddit": subreddit,
+                        "link_id": "t3_" + submission.id,
+                        "parent_id": comment.parent_id,
+                        "author": comment.author or "[deleted]",
+                        "body": comment.body,
+                        "score": comment.score,
+                        "created_utc": comment.created_utc,
+                    }
+                    comment_writer.write((json.dumps(line) + "\n").encode("utf-8"))
+            submission_writer.flush(zstandard.FLUSH_FRAME)
+            comment_writer.flush(zstandard.FLUSH_FRAME)
+        submission_paths.append(submission_path)
+        comment_paths.append(comment_path)
+
+    return submission_paths, comment_paths
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.archive_benchmark
+    directory = tempfile.mkdtemp()
+    try:
+        submission_paths, comment_paths = write_dumps(directory, 4, 200000)
+
+        for num_workers in [1, 2, 4]:
+            archive_data = ArchiveData(
+                submission_paths,
+                comment_paths,
+                SUBREDDITS,
+                TickerIndex([]),
+                num_workers=num_workers,
+            )
+            start = time.perf_counter()
+            data = archive_data.extract_data()
+            elapsed = time.perf_counter() - start
+            summary = archive_data.summary()
+            print(
+                "workers: {}  {:.2f}s  rows: {}  parsed: {:.1%} of lines  "
+                "{:.1f} MB/s decompressed, {:.1f} MB/s compressed".format(
+                    num_workers,
+                    elapsed,
+                    len(data),
+                    summary["parsed"] / summary["lines"],
+                    summary["decompressed_mb_per_s"],
+                    summary["compressed_mb_per_s"],
+                )
+            )
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from model.model import Model, set_seed
+from benchmark.model_benchmark import MODEL_NAME, create_long_tail_texts
+
+
+BACKENDS = ["pytorch", "quantized", "onnx"]
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.backend_benchmark
+    set_seed()
+    texts = create_long_tail_texts(1024)
+    batch_size = 16
+
+    eager_preds = None
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        model = Model(MODEL_NAME, batch_size, backend=backend)
+        load_elapsed = time.perf_counter() - start
+
+        # Time batches of 1 text for latency and the whole list for throughput
+        start = time.perf_counter()
+        for text in texts[:64]:
+            model.predict([text])
+        latency = (time.perf_counter() - start) / 64
+
+        start = time.perf_counter()
+        preds = model.predict(texts)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        if eager_preds is None:
+            eager_preds = np.array(preds)
+        agreement = np.mean(np.array(preds) == eager_preds)
+
+        print(
+            "{:<10} load: {:6.2f}s  latency: {:7.2f}ms  texts/sec: {:7.1f}  "
+            "agreement with eager: {:.2%}".format(
+                backend, load_elapsed, latency * 1000, throughput, agreement
+            )
+        )
@@ -0,0 +1,58 @@
+import time
+
+from data_extraction.comment_expansion import CommentExpander, ExpansionBudget
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_index import TickerIndex
+from benchmark.fake_reddit import FakeMoreComments
+from benchmark.synthetic_corpus import SyntheticCorpus
+from benchmark.ticker_match_benchmark import NASDAQ_PATH, OTC_PATH
+
+
+def create_expander(**kwargs) -> CommentExpander:
+    """Create expander of fake comment trees"""
+    return CommentExpander(more_comments_type=FakeMoreComments, **kwargs)
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.comment_expansion_benchmark
+    settings = [
+        ("full tree", None),
+        ("10 per submission", lambda: create_expander(max_more_per_submission=10)),
+        ("depth <= 2", lambda: create_expander(max_depth=2)),
+        (
+            "200 requests in run",
+            lambda: create_expander(budget=ExpansionBudget(max_requests=200)),
+        ),
+        (
+            "2s in run",
+            lambda: create_expander(budget=ExpansionBudget(max_seconds=2.0)),
+        ),
+    ]
+
+    for name, expander_factory in settings:
+        # Busy threads with 200 comments loaded up front, as on reddit
+        corpus = SyntheticCorpus.from_files([NASDAQ_PATH, OTC_PATH], comments_mu=6.0)
+        reddit = corpus.create_reddit(
+            20000, num_subreddits=2, latency=0.002, page_size=200
+        )
+        expander = expander_factory() if expander_factory else None
+        reddit_data = RedditData(
+            reddit,
+            sorted(reddit.subreddits),
+            100,
+            TickerIndex([]),
+            max_workers=8,
+            comment_expander=expander,
+        )
+
+        start = time.perf_counter()
+        data = reddit_data.extract_data()
+        elapsed = time.perf_counter() - start
+
+        line = "{:<20} {:>6.2f}s  rows: {:>6}".format(name, elapsed, len(data))
+        if expander is not None:
+            summary = expander.summary()
+            line += "  coverage: {:.1%}  requests: {}  stops: {}".format(
+                summary["coverage"], summary["more_requests"], summary["stop_reasons"]
+            )
+        print(line)
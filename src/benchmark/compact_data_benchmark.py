@@ -0,0 +1,43 @@
+import random
+
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_data import TickerData
+from benchmark.fake_reddit import FakeReddit, create_submission
+from benchmark.ticker_match_benchmark import (
+    NASDAQ_PATH,
+    OTC_PATH,
+    EXCEPTION_LIST,
+    WORDS,
+)
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.compact_data_benchmark
+    num_comments = 200000
+    comments_per_submission = 1000
+
+    ticker_data = TickerData([NASDAQ_PATH, OTC_PATH], EXCEPTION_LIST)
+    ticker_index = ticker_data.create_data()
+    words = WORDS * 10 + sorted(ticker_index.tickers)[:200]
+
+    rng = random.Random(0)
+    num_submissions = num_comments // comments_per_submission
+    submissions = [
+        create_submission(rng, comments_per_submission, words)
+        for _ in range(num_submissions)
+    ]
+    reddit = FakeReddit({"stocks": submissions})
+    reddit_data = RedditData(reddit, ["stocks"], num_submissions, ticker_index)
+
+    data = reddit_data.create_data()
+    compact_data = reddit_data.create_compact_data()
+    assert compact_data.to_frame().equals(data)
+
+    data_bytes = data.memory_usage(deep=True).sum()
+    compact_bytes = sum(compact_data.memory_usage().values())
+    scale = 1e6 / num_comments / 1e6
+    print("exploded rows: {}  posts: {}".format(len(data), len(compact_data.posts)))
+    print("DataFrame per 1M comments: {:8.1f}MB".format(data_bytes * scale))
+    print("compact   per 1M comments: {:8.1f}MB".format(compact_bytes * scale))
+    for table, table_bytes in compact_data.memory_usage().items():
+        print("  {:<12} {:8.1f}MB".format(table, table_bytes * scale))
@@ -0,0 +1,43 @@
+import random
+import time
+
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_index import TickerIndex
+from benchmark.fake_reddit import FakeReddit, create_submission
+from benchmark.record_buffer_benchmark import WORDS
+
+
+def create_fake_reddit(
+    num_subreddits: int, num_submissions: int, latency: float
+) -> FakeReddit:
+    """Create fake reddit client whose listings and comment trees sleep for
+    latency seconds per request"""
+    rng = random.Random(0)
+    subreddits = {
+        "subreddit_" + str(i): [
+            create_submission(rng, 50, WORDS, latency=latency)
+            for _ in range(num_submissions)
+        ]
+        for i in range(num_subreddits)
+    }
+    return FakeReddit(subreddits, latency)
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.concurrency_benchmark
+    reddit = create_fake_reddit(num_subreddits=3, num_submissions=20, latency=0.05)
+    subreddit_list = sorted(reddit.subreddits)
+
+    baseline = None
+    for max_workers in [1, 4, 8, 16]:
+        reddit_data = RedditData(
+            reddit, subreddit_list, 20, TickerIndex([]), max_workers=max_workers
+        )
+        start = time.perf_counter()
+        data = reddit_data.extract_data()
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = data
+        assert data.equals(baseline), "output order differs from serial fetch"
+        print("workers: {:>2}  elapsed: {:.2f}s".format(max_workers, elapsed))
@@ -0,0 +1,60 @@
+import time
+
+import pandas as pd
+
+from data_extraction.ticker_data import TickerData
+from benchmark.ticker_match_benchmark import NASDAQ_PATH, OTC_PATH, EXCEPTION_LIST
+
+
+LABEL_PATH = "data/ticker_labels.csv"
+WORD_LIST_PATH = "data/english_words.txt"
+
+
+def evaluate(ticker_index, texts: list, labels: list) -> tuple:
+    """Compute precision and recall of ticker matches against labels
+
+    Args:
+        ticker_index (TickerIndex): ticker index to evaluate
+        texts (list): list of text str
+        labels (list): list of sets of expected ticker symbols
+
+    Returns:
+        tuple: precision and recall
+    """
+    true_positives = false_positives = false_negatives = 0
+    for matches, label in zip(ticker_index.match_many(texts), labels):
+        matches = set(matches)
+        true_positives += len(matches & label)
+        false_positives += len(matches - label)
+        false_negatives += len(label - matches)
+
+    precision = true_positives / max(true_positives + false_positives, 1)
+    recall = true_positives / max(true_positives + false_negatives, 1)
+
+    return precision, recall
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.disambiguation_benchmark
+    label_df = pd.read_csv(LABEL_PATH, keep_default_na=False)
+    texts = list(label_df["text"])
+    labels = [set(tickers.split()) for tickers in label_df["tickers"]]
+    throughput_texts = texts * 20000
+
+    configs = [("exception list", None), ("metadata", WORD_LIST_PATH)]
+    for name, word_list_path in configs:
+        ticker_data = TickerData(
+            [NASDAQ_PATH, OTC_PATH], EXCEPTION_LIST, word_list_path=word_list_path
+        )
+        ticker_index = ticker_data.create_data()
+        precision, recall = evaluate(ticker_index, texts, labels)
+
+        start = time.perf_counter()
+        ticker_index.match_many(throughput_texts)
+        throughput = len(throughput_texts) / (time.perf_counter() - start)
+
+        print(
+            "{:<15} precision: {:.2f}  recall: {:.2f}  texts/sec: {:,.0f}".format(
+                name, precision, recall, throughput
+            )
+        )
@@ -0,0 +1,175 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_data import TickerData
+from benchmark.synthetic_corpus import SyntheticCorpus
+from benchmark.ticker_match_benchmark import EXCEPTION_LIST, NASDAQ_PATH, OTC_PATH
+
+
+SIZES = [10000, 100000, 1000000]
+RESULTS_DIR = "benchmark_results"
+MODEL_NAME = "albert-base-v2"
+
+
+def git_commit() -> str:
+    """Return short hash of HEAD, suffixed with -dirty if the tree has changes"""
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], universal_newlines=True
+        ).strip()
+        status = subprocess.check_output(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            universal_newlines=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+    return commit + "-dirty" if status.strip() else commit
+
+
+def timed_stage(stages: dict, name: str, rows: int, func, *args):
+    """Call func with args and record its wall time and throughput under name"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    stages[name] = {
+        "seconds": round(elapsed, 4),
+        "rows": rows,
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+    }
+    print("  {:<12} {:>9} rows  {:>8.2f}s".format(name, rows, elapsed))
+
+    return result
+
+
+def run(num_comments: int, model_rows: int, vader_workers: int, seed: int) -> dict:
+    """Time every component end to end on a synthetic corpus of num_comments
+    comments
+
+    Args:
+        num_comments (int): number of comments in the corpus
+        model_rows (int): number of rows scored by the transformer model,
+                        0 to skip the model
+        vader_workers (int): number of VADER worker processes
+        seed (int): random seed of the corpus
+
+    Returns:
+        dict: stage timings
+    """
+    stages = {}
+    csv_path_list = [NASDAQ_PATH, OTC_PATH]
+    ticker_data = TickerData(csv_path_list, EXCEPTION_LIST)
+    ticker_index = timed_stage(stages, "ticker_load", 0, ticker_data.create_data)
+    stages["ticker_load"]["rows"] = len(ticker_index)
+
+    corpus = SyntheticCorpus.from_files(csv_path_list, seed=seed)
+    reddit = timed_stage(
+        stages, "generate", num_comments, corpus.create_reddit, num_comments
+    )
+    subreddit_list = sorted(reddit.subreddits)
+    num_posts = max(len(sub.submissions) for sub in reddit.subreddits.values())
+    reddit_data = RedditData(reddit, subreddit_list, num_posts, ticker_index)
+
+    data = timed_stage(stages, "scrape", num_comments, reddit_data.extract_data)
+    num_rows = len(data)
+    data = timed_stage(stages, "transform", num_rows, reddit_data.transform_data, data)
+    data = timed_stage(
+        stages, "clean", len(data), reddit_data.remove_unwanted_char, data
+    )
+    data = timed_stage(stages, "extract", len(data), reddit_data.extract_ticker, data)
+
+    from model.vader import VaderSentimentAnalyzer
+
+    with VaderSentimentAnalyzer(num_workers=vader_workers) as analyzer:
+        timed_stage(
+            stages, "vader", len(data), analyzer.calculate_sentiment, data.copy()
+        )
+
+    if model_rows:
+        from model.model import Model, set_seed
+
+        set_seed(seed)
+        model = Model(MODEL_NAME, 16)
+        texts = list(data["body"].iloc[:model_rows])
+        timed_stage(stages, "model", len(texts), model.predict, texts)
+
+    return {
+        "num_comments": num_comments,
+        "output_rows": len(data),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "stages": stages,
+    }
+
+
+def compare(old_results: dict, new_results: dict) -> None:
+    """Print stage time ratios of new results over old results"""
+    old_runs = {run["num_comments"]: run for run in old_results["runs"]}
+    for new_run in new_results["runs"]:
+        old_run = old_runs.get(new_run["num_comments"])
+        if old_run is None:
+            continue
+        print(
+            "{} comments vs {}".format(new_run["num_comments"], old_results["commit"])
+        )
+        for name, stage in new_run["stages"].items():
+            old_stage = old_run["stages"].get(name)
+            if old_stage and old_stage["seconds"]:
+                print(
+                    "  {:<12} {:>8.2f}s -> {:>8.2f}s  {:.2f}x".format(
+                        name,
+                        old_stage["seconds"],
+                        stage["seconds"],
+                        stage["seconds"] / old_stage["seconds"],
+                    )
+                )
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.end_to_end_benchmark
+    parser = argparse.ArgumentParser(
+        description="Time the pipeline offline on synthetic reddit corpora"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--model-rows", type=int, default=1000)
+    parser.add_argument("--vader-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compare", help="commit whose stored results are compared against"
+    )
+    args = parser.parse_args()
+
+    runs = []
+    for num_comments in args.sizes:
+        print("{} comments".format(num_comments))
+        runs.append(run(num_comments, args.model_rows, args.vader_workers, args.seed))
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "model_rows": args.model_rows,
+        "runs": runs,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_path = os.path.join(RESULTS_DIR, commit + ".json")
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=4)
+    print("results written to", results_path)
+
+    if args.compare:
+        with open(os.path.join(RESULTS_DIR, args.compare + ".json")) as f:
+            compare(json.load(f), results)
@@ -0,0 +1,256 @@
+import random
+import string
+import time
+
+
+class FakeComment:
+    """Stand-in for praw.models.Comment with the attributes read by RedditData"""
+
+    # Synthetic corpora hold up to millions of comments
+    __slots__ = ["id", "author", "body", "created_utc", "score", "parent_id"]
+
+    def __init__(
+        self,
+        id: str,
+        author: str,
+        body: str,
+        created_utc: float,
+        score: int,
+        parent_id: str = None,
+    ):
+        self.id = id
+        self.author = author
+        self.body = body
+        self.created_utc = created_utc
+        self.score = score
+        self.parent_id = parent_id
+
+
+class FakeMoreComments:
+    """Stand-in for praw.models.MoreComments, a placeholder of comments not
+    loaded yet
+
+    Args:
+        comments (list): list of FakeComment loaded by the placeholder
+        parent_id (str): fullname of parent comment or submission
+        hidden (dict): mapping of parent fullname to list of FakeComment not
+                    loaded yet, shared by every placeholder of a submission
+        latency (float): seconds slept by comments to mimic a network round trip
+    """
+
+    def __init__(self, comments: list, parent_id: str, hidden: dict, latency: float):
+        self._comments = comments
+        self.parent_id = parent_id
+        self.hidden = hidden
+        self.latency = latency
+        self.count = len(comments)
+        self.children = [comment.id for comment in comments]
+
+    def comments(self, update: bool = True) -> list:
+        """Load comments, with placeholders of their own hidden replies"""
+        if self.latency:
+            time.sleep(self.latency)
+        return self._comments + create_more_comments(
+            ["t1_" + comment.id for comment in self._comments],
+            self.hidden,
+            self.latency,
+        )
+
+
+def create_more_comments(
+    parent_ids: list, hidden: dict, latency: float, batch_size: int = 100
+) -> list:
+    """Create placeholders of hidden replies of parent_ids, at most batch_size
+    comments each as in reddit's morechildren endpoint"""
+    more_comments = []
+    for parent_id in parent_ids:
+        replies = hidden.pop(parent_id, [])
+        for i in range(0, len(replies), batch_size):
+            more_comments.append(
+                FakeMoreComments(
+                    replies[i : i + batch_size], parent_id, hidden, latency
+                )
+            )
+    return more_comments
+
+
+class FakeCommentForest:
+    """Stand-in for praw.models.comment_forest.CommentForest
+
+    Args:
+        comments (list): list of FakeComment in breadth first order
+        latency (float): seconds slept by replace_more to mimic network round trips
+        submission_id (str): id of submission, used as parent of top level comments
+        page_size (int): number of comments loaded with the submission, the
+                    rest are behind FakeMoreComments placeholders. None loads
+                    every comment
+    """
+
+    def __init__(
+        self,
+        comments: list,
+        latency: float = 0.0,
+        submission_id: str = None,
+        page_size: int = None,
+    ):
+        self.latency = latency
+        self.page_size = page_size
+        if page_size is None:
+            self._items = list(comments)
+            return
+
+        hidden = {}
+        for comment in comments[page_size:]:
+            hidden.setdefault(comment.parent_id, []).append(comment)
+        loaded = comments[:page_size]
+        parent_ids = ["t3_" + str(submission_id)]
+        parent_ids += ["t1_" + comment.id for comment in loaded]
+        self._items = loaded + create_more_comments(parent_ids, hidden, latency)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def replace_more(self, limit: int = 32) -> list:
+        if self.page_size is None:
+            if self.latency:
+                time.sleep(self.latency)
+            return []
+
+        # Expand placeholders breadth first, as praw does
+        queue = [item for item in self._items if isinstance(item, FakeMoreComments)]
+        self._items = [
+            item for item in self._items if not isinstance(item, FakeMoreComments)
+        ]
+        skipped = []
+        while queue:
+            more = queue.pop(0)
+            if limit is not None and limit <= 0:
+                skipped.append(more)
+                continue
+            if limit is not None:
+                limit -= 1
+            for item in more.comments():
+                if isinstance(item, FakeMoreComments):
+                    queue.append(item)
+                else:
+                    self._items.append(item)
+        self._items += skipped
+
+        return skipped
+
+    def list(self) -> list:
+        return list(self._items)
+
+
+class FakeSubmission:
+    """Stand-in for praw.models.Submission with canned comments"""
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        author: str,
+        selftext: str,
+        created_utc: float,
+        score: int,
+        comments: list,
+        latency: float = 0.0,
+        page_size: int = None,
+    ):
+        self.id = id
+        self.title = title
+        self.author = author
+        self.selftext = selftext
+        self.created_utc = created_utc
+        self.score = score
+        self.num_comments = len(comments)
+        self.subreddit = None
+        self.comments = FakeCommentForest(comments, latency, id, page_size)
+
+
+class FakeSubreddit:
+    """Stand-in for praw.models.Subreddit serving canned submissions, newest first"""
+
+    def __init__(self, display_name: str, submissions: list, latency: float = 0.0):
+        self.display_name = display_name
+        self.submissions = submissions
+        self.latency = latency
+        for submission in submissions:
+            submission.subreddit = display_name
+
+    def new(self, limit: int = 100):
+        if self.latency:
+            time.sleep(self.latency)
+        return iter(self.submissions[:limit])
+
+
+class FakeReddit:
+    """Stand-in for praw.Reddit serving canned subreddits
+
+    Args:
+        subreddits (dict): mapping of subreddit name to list of FakeSubmission
+        latency (float): seconds slept by each subreddit listing request
+    """
+
+    def __init__(self, subreddits: dict, latency: float = 0.0):
+        self.subreddits = {
+            name: FakeSubreddit(name, submissions, latency)
+            for name, submissions in subreddits.items()
+        }
+
+    def subreddit(self, display_name: str) -> FakeSubreddit:
+        return self.subreddits[display_name]
+
+    def submission(self, id: str) -> FakeSubmission:
+        for subreddit in self.subreddits.values():
+            for submission in subreddit.submissions:
+                if submission.id == id:
+                    return submission
+        raise KeyError(id)
+
+
+def random_id(rng: random.Random, length: int = 7) -> str:
+    """Create a random base36 id similar to reddit's"""
+    alphabet = string.ascii_lowercase + string.digits
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+def create_submission(
+    rng: random.Random,
+    num_comments: int,
+    words: list,
+    start_utc: float = 1.6e9,
+    latency: float = 0.0,
+) -> FakeSubmission:
+    """Create a fake submission with num_comments comments built from words
+
+    Args:
+        rng (random.Random): random generator
+        num_comments (int): number of comments in the submission
+        words (list): vocabulary used to build comment bodies
+        start_utc (float): created_utc of the submission
+        latency (float): seconds slept when expanding the comment tree
+
+    Returns:
+        FakeSubmission: fake submission
+    """
+    comments = [
+        FakeComment(
+            random_id(rng),
+            "user_" + str(rng.randrange(10000)),
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 40))),
+            start_utc + i,
+            rng.randint(-5, 500),
+        )
+        for i in range(num_comments)
+    ]
+    return FakeSubmission(
+        random_id(rng, 6),
+        " ".join(rng.choice(words) for _ in range(8)),
+        "user_" + str(rng.randrange(10000)),
+        " ".join(rng.choice(words) for _ in range(50)),
+        start_utc,
+        rng.randint(0, 5000),
+        comments,
+        latency,
+    )
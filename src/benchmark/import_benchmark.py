@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+
+# Modules of each entry point, imported in a fresh interpreter
+MODULES = [
+    "data_extraction.ticker_index",
+    "data_extraction.ticker_data",
+    "data_extraction.reddit_data",
+    "data_aggregation.rollup_store",
+    "data_storage.reddit_store",
+    "model.prediction_cache",
+    "model.model",
+    "model.sharded_model",
+    "model.vader",
+    "data_preprocess",
+    "pipeline",
+]
+
+# Heavy dependencies which should only load on first use
+HEAVY_MODULES = ["praw", "torch", "transformers", "nltk", "pyarrow", "streamlit"]
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy_modules!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure_import(module: str, repeat: int = 3) -> tuple:
+    """Import module in a fresh interpreter and measure import time
+
+    Args:
+        module (str): module name, importable with src on PYTHONPATH
+        repeat (int): number of measurements, the fastest is kept
+
+    Returns:
+        tuple: import time in seconds and list of heavy modules loaded
+    """
+    src_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=src_path)
+    script = SCRIPT.format(module=module, heavy_modules=HEAVY_MODULES)
+
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout.split()
+        elapsed, loaded = float(output[0]), output[1:]
+        if best is None or elapsed < best[0]:
+            best = (elapsed, loaded[0].split(",") if loaded else [])
+
+    return best
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.import_benchmark
+    for module in MODULES:
+        elapsed, loaded = measure_import(module)
+        print(
+            "{:<32} {:7.1f}ms  heavy modules loaded: {}".format(
+                module, elapsed * 1000, ", ".join(loaded) or "-"
+            )
+        )
@@ -0,0 +1,45 @@
+import random
+import time
+
+from model.model import Model, set_seed
+from benchmark.record_buffer_benchmark import WORDS
+
+
+MODEL_NAME = "albert-base-v2"
+
+
+def create_long_tail_texts(num_texts: int, seed: int = 0) -> list:
+    """Create texts whose word counts follow a long tailed distribution,
+    similar to reddit comment lengths
+
+    Args:
+        num_texts (int): number of texts to create
+        seed (int): random seed
+
+    Returns:
+        list: list of text str
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(num_texts):
+        num_words = min(int(rng.lognormvariate(2.5, 1.0)) + 1, 600)
+        texts.append(" ".join(rng.choice(WORDS) for _ in range(num_words)))
+
+    return texts
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.model_benchmark
+    set_seed()
+    texts = create_long_tail_texts(512)
+
+    for batch_size in [2, 8, 16, 32, 64]:
+        model = Model(MODEL_NAME, batch_size)
+        start = time.perf_counter()
+        model.predict(texts)
+        elapsed = time.perf_counter() - start
+        print(
+            "batch size: {:>3}  texts/sec: {:.1f}".format(
+                batch_size, len(texts) / elapsed
+            )
+        )
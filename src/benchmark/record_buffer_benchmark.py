@@ -0,0 +1,47 @@
+import random
+import time
+
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_index import TickerIndex
+from benchmark.fake_reddit import FakeReddit, create_submission
+
+
+WORDS = ["the", "stock", "to", "moon", "GME", "$TSLA", "buy", "hold", "puts", "AMC"]
+
+
+def time_extraction(num_comments: int, comments_per_submission: int = 1000) -> float:
+    """Time RedditData.extract_data on a fake subreddit with num_comments comments
+
+    Args:
+        num_comments (int): total number of synthetic comments
+        comments_per_submission (int): number of comments in each submission
+
+    Returns:
+        float: wall time in seconds
+    """
+    rng = random.Random(0)
+    num_submissions = max(1, num_comments // comments_per_submission)
+    submissions = [
+        create_submission(rng, comments_per_submission, WORDS)
+        for _ in range(num_submissions)
+    ]
+    reddit = FakeReddit({"stocks": submissions})
+    reddit_data = RedditData(reddit, ["stocks"], num_submissions, TickerIndex([]))
+
+    start = time.perf_counter()
+    data = reddit_data.extract_data()
+    elapsed = time.perf_counter() - start
+    assert len(data) == num_submissions * comments_per_submission
+
+    return elapsed
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.record_buffer_benchmark
+    for num_comments in [1000, 10000, 100000]:
+        elapsed = time_extraction(num_comments)
+        print(
+            "comments: {:>7}  total: {:8.3f}s  per 1k comments: {:.4f}s".format(
+                num_comments, elapsed, elapsed / num_comments * 1000
+            )
+        )
@@ -0,0 +1,102 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+
+from model.scoring_service import MicroBatcher, ScoringServer
+from benchmark.model_benchmark import MODEL_NAME, create_long_tail_texts
+
+
+class SimulatedModel:
+    """Stand-in for Model whose predict costs a fixed overhead per batch plus
+    a cost per text, as a forward pass does, so that the service can be load
+    tested without model weights
+
+    Args:
+        batch_ms (float): milliseconds per batch
+        text_ms (float): milliseconds per text
+    """
+
+    def __init__(self, batch_ms: float = 20.0, text_ms: float = 1.0):
+        self.batch_ms = batch_ms
+        self.text_ms = text_ms
+
+    def predict(self, text: list) -> list:
+        time.sleep((self.batch_ms + self.text_ms * len(text)) / 1000)
+        return [len(string) % 2 for string in text]
+
+
+def run_clients(url: str, texts: list, num_clients: int) -> list:
+    """Send one text per request from num_clients concurrent clients
+
+    Returns:
+        list: latency in seconds of every request
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def client(client_texts: list) -> None:
+        for text in client_texts:
+            data = json.dumps({"texts": [text]}).encode("utf-8")
+            start = time.perf_counter()
+            with urllib.request.urlopen(url + "/predict", data) as response:
+                json.loads(response.read())
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [
+        threading.Thread(target=client, args=(texts[i::num_clients],))
+        for i in range(num_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return latencies
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.scoring_service_benchmark
+    parser = argparse.ArgumentParser(description="Load test the scoring service")
+    parser.add_argument("--model", action="store_true", help="load the real model")
+    parser.add_argument("--num-clients", type=int, default=32)
+    parser.add_argument("--num-requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.model:
+        from model.model import Model, set_seed
+
+        set_seed()
+        model = Model(MODEL_NAME, args.max_batch_size)
+    else:
+        model = SimulatedModel()
+    texts = create_long_tail_texts(args.num_requests)
+
+    for max_wait_ms in [0.0, 2.0, 10.0, 25.0]:
+        batcher = MicroBatcher(model, args.max_batch_size, max_wait_ms)
+        server = ScoringServer(("127.0.0.1", 0), batcher)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://{}:{}".format(*server.server_address)
+
+        start = time.perf_counter()
+        latencies = sorted(run_clients(url, texts, args.num_clients))
+        elapsed = time.perf_counter() - start
+        with urllib.request.urlopen(url + "/stats") as response:
+            stats = json.loads(response.read())
+
+        server.shutdown()
+        server.server_close()
+        batcher.close()
+        print(
+            "max wait: {:>4.0f}ms  req/sec: {:7.1f}  p50: {:6.1f}ms  p99: {:6.1f}ms  "
+            "mean batch: {:4.1f}".format(
+                max_wait_ms,
+                len(latencies) / elapsed,
+                latencies[len(latencies) // 2] * 1000,
+                latencies[int(len(latencies) * 0.99)] * 1000,
+                stats["mean_batch_size"],
+            )
+        )
@@ -0,0 +1,31 @@
+import time
+
+from model.model import set_seed
+from model.sharded_model import ShardedModel
+from benchmark.model_benchmark import MODEL_NAME, create_long_tail_texts
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.sharded_model_benchmark
+    set_seed()
+    texts = create_long_tail_texts(4096)
+    batch_size = 16
+
+    baseline = None
+    for num_workers in [1, 2, 4, 8, 16, 32]:
+        with ShardedModel(MODEL_NAME, batch_size, num_workers) as model:
+            # Warm up so that model loading is not timed
+            model.predict(texts[: num_workers * model.shard_size])
+
+            start = time.perf_counter()
+            model.predict(texts)
+            elapsed = time.perf_counter() - start
+
+        throughput = len(texts) / elapsed
+        if baseline is None:
+            baseline = throughput
+        print(
+            "workers: {:>2}  texts/sec: {:8.1f}  speedup: {:.2f}x".format(
+                num_workers, throughput, throughput / baseline
+            )
+        )
@@ -0,0 +1,96 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from data_storage.reddit_store import RedditStore
+from benchmark.model_benchmark import create_long_tail_texts
+
+
+def create_reddit_df(num_rows: int, num_days: int, seed: int = 0) -> pd.DataFrame:
+    """Create synthetic data shaped like RedditData.create_data output,
+    spread over num_days days and a few subreddits"""
+    rng = random.Random(seed)
+    start_utc = int(pd.Timestamp("2021-01-01", tz="UTC").timestamp())
+    return pd.DataFrame(
+        {
+            "submission_title": ["daily discussion thread"] * num_rows,
+            "submission_id": [str(rng.randrange(1000)) for _ in range(num_rows)],
+            "subreddit": [rng.choice(["stocks", "investing"]) for _ in range(num_rows)],
+            "author": ["user_" + str(rng.randrange(10000)) for _ in range(num_rows)],
+            "body": create_long_tail_texts(num_rows, seed),
+            "created_utc": [
+                start_utc + rng.randrange(num_days * 86400) for _ in range(num_rows)
+            ],
+            "id": [str(i) for i in range(num_rows)],
+            "score": [rng.randint(-5, 500) for _ in range(num_rows)],
+            "type": "comment",
+            "ticker": [
+                rng.choice(["GME", "AMC", "TSLA", None]) for _ in range(num_rows)
+            ],
+        }
+    )
+
+
+def directory_size(path: str) -> int:
+    """Return total size of files under path in bytes"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def timed(func, *args, **kwargs):
+    """Return result of func and its wall time in seconds"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.storage_benchmark
+    df = create_reddit_df(500000, num_days=60)
+    week_start = pd.Timestamp("2021-02-01", tz="UTC")
+    week_end = pd.Timestamp("2021-02-08", tz="UTC")
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        csv_path = os.path.join(temp_dir, "reddit_data.csv")
+        _, csv_write = timed(df.to_csv, csv_path, index=False)
+        _, csv_read = timed(pd.read_csv, csv_path)
+
+        def read_csv_slice():
+            columns = ["created_utc", "ticker", "score"]
+            csv_df = pd.read_csv(csv_path, usecols=columns)
+            datetime = pd.to_datetime(csv_df["created_utc"], unit="s", utc=True)
+            in_range = (datetime >= week_start) & (datetime < week_end)
+            return csv_df[in_range]
+
+        _, csv_slice = timed(read_csv_slice)
+
+        store = RedditStore(os.path.join(temp_dir, "reddit_store"))
+        _, store_write = timed(store.write, df)
+        _, store_read = timed(store.read)
+        _, store_slice = timed(
+            store.read,
+            columns=["created_utc", "ticker", "score"],
+            start=week_start,
+            end=week_end,
+        )
+
+        row_format = "{:<8} size: {:6.1f}MB  write: {:.2f}s  read: {:.2f}s  "
+        row_format += "week slice: {:.2f}s"
+        csv_size = os.path.getsize(csv_path) / 1e6
+        store_size = directory_size(store.root_path) / 1e6
+        print(row_format.format("csv", csv_size, csv_write, csv_read, csv_slice))
+        print(
+            row_format.format(
+                "parquet", store_size, store_write, store_read, store_slice
+            )
+        )
+    finally:
+        shutil.rmtree(temp_dir)
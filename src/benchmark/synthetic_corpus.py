@@ -0,0 +1,266 @@
+import itertools
+import random
+
+from benchmark.fake_reddit import (
+    FakeComment,
+    FakeReddit,
+    FakeSubmission,
+    random_id,
+)
+
+
+WORD_LIST_PATH = "data/english_words.txt"
+DELETED_BODIES = ["[deleted]", "[removed]"]
+
+
+class SyntheticCorpus:
+    """Generator of a reproducible synthetic reddit corpus served by a fake
+    PRAW client
+
+    Comments per submission and words per body follow log-normal
+    distributions, as on reddit most threads and comments are short while a
+    few are very long. Ticker popularity follows a Zipf distribution, so a
+    handful of symbols get most mentions. A share of comments repeat an
+    earlier body, as copypasta and bot replies do, and a share are deleted
+
+    Args:
+        tickers (list): ticker symbols mentioned in the corpus
+        words (list): vocabulary of bodies and titles, lowercase so that
+                    words are never matched as tickers
+        seed (int): random seed
+        comments_mu (float): mu of log-normal comments per submission
+        comments_sigma (float): sigma of log-normal comments per submission
+        words_mu (float): mu of log-normal words per comment body
+        words_sigma (float): sigma of log-normal words per comment body
+        ticker_density (float): probability of a comment mentioning tickers
+        title_ticker_density (float): probability of a title mentioning a ticker
+        dollar_rate (float): probability of a mention being written as $SYMBOL
+        duplicate_rate (float): probability of a comment repeating an earlier body
+        deleted_rate (float): probability of a comment being deleted
+        zipf_exponent (float): exponent of ticker popularity distribution
+        start_utc (int): created_utc of the oldest submission
+        span_seconds (int): time span over which submissions are created
+    """
+
+    def __init__(
+        self,
+        tickers: list,
+        words: list,
+        seed: int = 0,
+        comments_mu: float = 3.5,
+        comments_sigma: float = 1.2,
+        words_mu: float = 2.7,
+        words_sigma: float = 1.0,
+        ticker_density: float = 0.15,
+        title_ticker_density: float = 0.5,
+        dollar_rate: float = 0.3,
+        duplicate_rate: float = 0.05,
+        deleted_rate: float = 0.03,
+        zipf_exponent: float = 1.1,
+        start_utc: int = 1600000000,
+        span_seconds: int = 7 * 86400,
+    ):
+        """Constructor method"""
+        self.rng = random.Random(seed)
+        self.words = words
+        self.comments_mu = comments_mu
+        self.comments_sigma = comments_sigma
+        self.words_mu = words_mu
+        self.words_sigma = words_sigma
+        self.ticker_density = ticker_density
+        self.title_ticker_density = title_ticker_density
+        self.dollar_rate = dollar_rate
+        self.duplicate_rate = duplicate_rate
+        self.deleted_rate = deleted_rate
+        self.start_utc = start_utc
+        self.span_seconds = span_seconds
+
+        # Popularity rank is random rather than alphabetical
+        self.tickers = sorted(tickers)
+        self.rng.shuffle(self.tickers)
+        self.ticker_cum_weights = list(
+            itertools.accumulate(
+                1 / rank ** zipf_exponent for rank in range(1, len(self.tickers) + 1)
+            )
+        )
+        self.recent_bodies = []
+
+    @classmethod
+    def from_files(
+        cls, csv_path_list: list, word_list_path: str = WORD_LIST_PATH, **kwargs
+    ) -> "SyntheticCorpus":
+        """Create corpus mentioning the symbols of ticker csv files
+
+        Args:
+            csv_path_list (list): list of path of csv files containing ticker info
+            word_list_path (str): path of file with one word per line
+
+        Returns:
+            SyntheticCorpus: corpus generator
+        """
+        from data_extraction.ticker_data import TickerData
+
+        ticker_data = TickerData(csv_path_list, [])
+        tickers = ticker_data.read_ticker_file(csv_path_list, "Symbol")
+        tickers = ticker_data.remove_exceptions(tickers, [])
+        words = sorted(ticker_data.read_word_list(word_list_path))
+
+        return cls(tickers, words, **kwargs)
+
+    def create_reddit(
+        self,
+        num_comments: int,
+        num_subreddits: int = 4,
+        latency: float = 0.0,
+        page_size: int = None,
+    ) -> FakeReddit:
+        """Create fake reddit client serving num_comments comments spread
+        over num_subreddits subreddits
+
+        Args:
+            num_comments (int): total number of comments
+            num_subreddits (int): number of subreddits
+            latency (float): seconds slept by each request
+            page_size (int): number of comments loaded with a submission, the
+                        rest are behind MoreComments placeholders. None loads
+                        every comment
+
+        Returns:
+            FakeReddit: fake reddit client
+        """
+        subreddits = {"subreddit_" + str(i): [] for i in range(num_subreddits)}
+        names = sorted(subreddits)
+        for submission in self.create_submissions(num_comments, latency, page_size):
+            subreddits[self.rng.choice(names)].append(submission)
+
+        # Listings are served newest first
+        for submissions in subreddits.values():
+            submissions.sort(key=lambda submission: -submission.created_utc)
+
+        return FakeReddit(subreddits, latency)
+
+    def create_submissions(
+        self, num_comments: int, latency: float = 0.0, page_size: int = None
+    ) -> list:
+        """Create submissions holding num_comments comments in total
+
+        Args:
+            num_comments (int): total number of comments
+            latency (float): seconds slept when expanding a comment tree
+            page_size (int): number of comments loaded with a submission
+
+        Returns:
+            list: list of FakeSubmission
+        """
+        submissions = []
+        remaining = num_comments
+        while remaining > 0:
+            size = int(self.rng.lognormvariate(self.comments_mu, self.comments_sigma))
+            size = min(size, remaining)
+            submissions.append(self.create_submission(size, latency, page_size))
+            remaining -= size
+
+        return submissions
+
+    def create_submission(
+        self, num_comments: int, latency: float = 0.0, page_size: int = None
+    ) -> FakeSubmission:
+        """Create a submission with a comment tree of num_comments comments
+
+        Args:
+            num_comments (int): number of comments
+            latency (float): seconds slept when expanding the comment tree
+            page_size (int): number of comments loaded with the submission
+
+        Returns:
+            FakeSubmission: fake submission
+        """
+        rng = self.rng
+        submission_id = random_id(rng, 6)
+        created_utc = self.start_utc + rng.randrange(self.span_seconds)
+
+        title = self.create_text(rng.randint(4, 16))
+        if rng.random() < self.title_ticker_density:
+            title += " " + self.create_mention()
+
+        comments = []
+        for _ in range(num_comments):
+            # Half of the comments reply to the submission, the rest to an
+            # earlier comment of the thread
+            if comments and rng.random() < 0.5:
+                parent_id = "t1_" + rng.choice(comments).id
+            else:
+                parent_id = "t3_" + submission_id
+            created_utc_comment = created_utc + int(rng.expovariate(1 / 3600))
+            if rng.random() < self.deleted_rate:
+                author, body = None, rng.choice(DELETED_BODIES)
+            else:
+                author, body = self.create_author(), self.create_body()
+            comments.append(
+                FakeComment(
+                    random_id(rng),
+                    author,
+                    body,
+                    created_utc_comment,
+                    int(rng.paretovariate(1.5)) - 1,
+                    parent_id,
+                )
+            )
+
+        return FakeSubmission(
+            submission_id,
+            title,
+            self.create_author(),
+            self.create_text(int(rng.lognormvariate(3.5, 1.0))),
+            created_utc,
+            int(rng.paretovariate(1.2)) - 1,
+            comments,
+            latency,
+            page_size,
+        )
+
+    def create_body(self) -> str:
+        """Create a comment body, repeating an earlier body at duplicate_rate
+
+        Returns:
+            str: comment body
+        """
+        rng = self.rng
+        if self.recent_bodies and rng.random() < self.duplicate_rate:
+            return rng.choice(self.recent_bodies)
+
+        num_words = min(int(rng.lognormvariate(self.words_mu, self.words_sigma)), 1000)
+        tokens = rng.choices(self.words, k=num_words + 1)
+        if rng.random() < self.ticker_density:
+            # Mostly one mention, sometimes a comparison of several tickers
+            for _ in range(min(int(rng.expovariate(1.5)) + 1, 5)):
+                tokens.insert(rng.randrange(len(tokens) + 1), self.create_mention())
+        body = " ".join(tokens)
+
+        # Bounded pool of earlier bodies that duplicates are drawn from
+        if len(self.recent_bodies) < 1000:
+            self.recent_bodies.append(body)
+        else:
+            self.recent_bodies[rng.randrange(1000)] = body
+
+        return body
+
+    def create_mention(self) -> str:
+        """Create a ticker mention, written as $SYMBOL at dollar_rate
+
+        Returns:
+            str: ticker mention
+        """
+        ticker = self.rng.choices(self.tickers, cum_weights=self.ticker_cum_weights)[0]
+        if self.rng.random() < self.dollar_rate:
+            return "$" + ticker
+
+        return ticker
+
+    def create_text(self, num_words: int) -> str:
+        """Create text of num_words words without tickers"""
+        return " ".join(self.rng.choices(self.words, k=max(num_words, 1)))
+
+    def create_author(self) -> str:
+        """Create an author name, a few authors write most of the content"""
+        return "user_" + str(int(self.rng.paretovariate(0.8)) % 100000)
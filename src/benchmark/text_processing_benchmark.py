@@ -0,0 +1,53 @@
+import re
+import time
+
+import pandas as pd
+
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_data import TickerData
+from benchmark.ticker_match_benchmark import (
+    NASDAQ_PATH,
+    OTC_PATH,
+    EXCEPTION_LIST,
+    create_texts,
+)
+
+
+def legacy_process(df: pd.DataFrame, ticker_set: set) -> pd.DataFrame:
+    """Previous implementation: row-wise re.sub, row-wise set intersection,
+    explode and a regex pass to remove $ sign. ticker_set is a set here so
+    that only the cost of the row-wise passes is compared"""
+    df["body"] = df["body"].apply(lambda text: re.sub(r"[^\w\d\s\$]+", "", text))
+    df["ticker"] = df["body"].apply(
+        lambda text: list(set(text.split(" ")).intersection(ticker_set))
+    )
+    df = df.explode("ticker").reset_index(drop=True)
+    df["ticker"] = df["ticker"].str.replace("$", "", regex=False)
+
+    return df
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.text_processing_benchmark
+    num_rows = 100000
+
+    ticker_data = TickerData([NASDAQ_PATH, OTC_PATH], EXCEPTION_LIST)
+    ticker_index = ticker_data.create_data()
+    tickers = sorted(ticker_index.tickers)
+    ticker_set = set(tickers + ["$" + ticker for ticker in tickers])
+    texts = [text + " !!" for text in create_texts(num_rows, tickers)]
+    reddit_data = RedditData(None, [], 0, ticker_index)
+
+    start = time.perf_counter()
+    legacy_df = legacy_process(pd.DataFrame({"body": texts}), ticker_set)
+    legacy_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = reddit_data.remove_unwanted_char(pd.DataFrame({"body": texts}))
+    df = reddit_data.extract_ticker(df)
+    elapsed = time.perf_counter() - start
+
+    print("rows: {}".format(num_rows))
+    print("legacy per 100k rows: {:.3f}s".format(legacy_elapsed / num_rows * 1e5))
+    print("vectorized per 100k rows: {:.3f}s".format(elapsed / num_rows * 1e5))
+    print("exploded rows legacy / vectorized: {} / {}".format(len(legacy_df), len(df)))
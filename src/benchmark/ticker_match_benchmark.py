@@ -0,0 +1,75 @@
+import random
+import time
+
+from data_extraction.ticker_data import TickerData
+
+
+NASDAQ_PATH = "data/nasdaq_screener.csv"
+OTC_PATH = "data/otc_screener.csv"
+EXCEPTION_LIST = ["TD", "ANY", "CEO", "EV"]
+WORDS = ["the", "stock", "to", "moon", "buy", "hold", "puts", "calls", "is", "going"]
+
+
+def create_texts(num_texts: int, tickers: list, seed: int = 0) -> list:
+    """Create synthetic comments mixing common words, tickers and $ tickers
+    separated by spaces, newlines and tabs
+
+    Args:
+        num_texts (int): number of comments to create
+        tickers (list): ticker symbols to sprinkle into comments
+        seed (int): random seed
+
+    Returns:
+        list: list of comment str
+    """
+    rng = random.Random(seed)
+    separators = [" ", " ", " ", "\n", "\t"]
+    texts = []
+    for _ in range(num_texts):
+        tokens = []
+        for _ in range(rng.randint(3, 40)):
+            draw = rng.random()
+            if draw < 0.05:
+                tokens.append(rng.choice(tickers))
+            elif draw < 0.07:
+                tokens.append("$" + rng.choice(tickers))
+            else:
+                tokens.append(rng.choice(WORDS))
+            tokens.append(rng.choice(separators))
+        texts.append("".join(tokens))
+
+    return texts
+
+
+def legacy_match(texts: list, ticker_list: list) -> list:
+    """Previous implementation: per row set intersection against a list"""
+    return [list(set(text.split(" ")).intersection(ticker_list)) for text in texts]
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.ticker_match_benchmark
+    num_texts = 1000000
+    legacy_sample = 10000
+
+    ticker_data = TickerData([NASDAQ_PATH, OTC_PATH], EXCEPTION_LIST)
+    ticker_index = ticker_data.create_data()
+    tickers = sorted(ticker_index.tickers)
+    ticker_list = tickers + ["$" + ticker for ticker in tickers]
+    texts = create_texts(num_texts, tickers)
+
+    start = time.perf_counter()
+    legacy_match(texts[:legacy_sample], ticker_list)
+    legacy_elapsed = (time.perf_counter() - start) * num_texts / legacy_sample
+
+    start = time.perf_counter()
+    ticker_index.match_many(texts)
+    index_elapsed = time.perf_counter() - start
+
+    print("comments: {}".format(num_texts))
+    print(
+        "legacy intersection (extrapolated from {}): {:.2f}s".format(
+            legacy_sample, legacy_elapsed
+        )
+    )
+    print("TickerIndex.match_many: {:.2f}s".format(index_elapsed))
+    print("speedup: {:.1f}x".format(legacy_elapsed / index_elapsed))
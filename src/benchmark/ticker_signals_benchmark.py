@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_aggregation.ticker_signals import TickerSignals, WINDOWS
+
+
+def create_mention_df(
+    num_mentions: int, num_tickers: int, num_days: int, seed: int = 0
+) -> pd.DataFrame:
+    """Create mention table with Zipf distributed ticker popularity
+
+    Args:
+        num_mentions (int): number of rows
+        num_tickers (int): number of distinct tickers
+        num_days (int): number of days of history
+        seed (int): random seed
+
+    Returns:
+        pd.DataFrame: DataFrame with columns of RedditData.create_data used by
+                    TickerSignals
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, num_tickers + 1) ** 1.1
+    tickers = np.array(["T" + str(i) for i in range(num_tickers)], dtype=object)
+    authors = np.array(["user_" + str(i) for i in range(100000)], dtype=object)
+    df = pd.DataFrame(
+        {
+            "ticker": tickers[
+                rng.choice(num_tickers, num_mentions, p=weights / weights.sum())
+            ],
+            "author": authors[rng.zipf(1.5, num_mentions) % len(authors)],
+            "created_utc": 1600000000
+            + rng.integers(0, num_days * 86400, num_mentions, dtype=np.int64),
+            "score": rng.integers(-5, 500, num_mentions),
+            "sentiment_score": rng.integers(0, 2, num_mentions),
+        }
+    )
+    # Deleted authors
+    df.loc[df.index[::50], "author"] = None
+
+    return df
+
+
+def rolling_signals(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """Compute windowed mentions and unique authors of ticker with pandas
+    rolling windows, to check TickerSignals against"""
+    df = df[df["ticker"] == ticker].copy()
+    df["datetime"] = pd.to_datetime(df["created_utc"], unit="s", utc=True).dt.floor(
+        "1H"
+    )
+    hours = df.groupby("datetime").size().index
+    expected = pd.DataFrame(index=hours)
+    for name, length in WINDOWS.items():
+        mentions = df.groupby("datetime").size().rolling(str(length) + "H").sum()
+        expected["mentions_" + name] = mentions
+        expected["unique_authors_" + name] = [
+            df.loc[
+                (df["datetime"] > hour - pd.Timedelta(hours=length))
+                & (df["datetime"] <= hour),
+                "author",
+            ].nunique()
+            for hour in hours
+        ]
+
+    return expected
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.ticker_signals_benchmark
+    df = create_mention_df(num_mentions=5000000, num_tickers=20000, num_days=90)
+    engine = TickerSignals()
+
+    start = time.perf_counter()
+    signals = engine.compute(df)
+    elapsed = time.perf_counter() - start
+    print(
+        "{} mentions -> {} ticker hours in {:.2f}s".format(
+            len(df), len(signals), elapsed
+        )
+    )
+
+    # Check windows of a popular and a rare ticker against pandas rolling
+    for ticker in ["T0", "T5000"]:
+        expected = rolling_signals(df, ticker)
+        actual = signals.xs(ticker, level="ticker")[expected.columns]
+        pd.testing.assert_frame_equal(
+            actual, expected, check_dtype=False, check_names=False
+        )
+        print(ticker, "matches pandas rolling windows")
@@ -0,0 +1,34 @@
+import shutil
+import tempfile
+import time
+
+from model.model import Model, set_seed
+from model.token_cache import TokenCache
+from benchmark.model_benchmark import MODEL_NAME, create_long_tail_texts
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.token_cache_benchmark
+    set_seed()
+    texts = create_long_tail_texts(20000)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        model = Model(MODEL_NAME, 32)
+        start = time.perf_counter()
+        model.encode(texts)
+        print("tokenize:           {:.2f}s".format(time.perf_counter() - start))
+
+        model = Model(MODEL_NAME, 32, token_cache=TokenCache(cache_dir))
+        start = time.perf_counter()
+        model.encode(texts)
+        print("tokenize and cache: {:.2f}s".format(time.perf_counter() - start))
+
+        # A new model head reading the same scrape
+        model = Model(MODEL_NAME, 32, token_cache=TokenCache(cache_dir))
+        start = time.perf_counter()
+        token_ids = model.encode(texts)
+        print("read from cache:    {:.2f}s".format(time.perf_counter() - start))
+        print("cache stats:", model.token_cache.stats())
+        assert len(token_ids) == len(texts)
+    finally:
+        shutil.rmtree(cache_dir)
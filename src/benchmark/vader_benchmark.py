@@ -0,0 +1,35 @@
+import os
+import time
+
+import pandas as pd
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from model.vader import VaderSentimentAnalyzer
+from benchmark.model_benchmark import create_long_tail_texts
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m benchmark.vader_benchmark
+    num_rows = 200000
+    data = pd.DataFrame(
+        {"body": create_long_tail_texts(num_rows), "score": range(num_rows)}
+    )
+    # Mix in deleted content as in scraped data
+    data.loc[::20, "body"] = "[deleted]"
+
+    vader = SentimentIntensityAnalyzer()
+    start = time.perf_counter()
+    data["body"].apply(lambda text: vader.polarity_scores(text)["compound"])
+    apply_elapsed = time.perf_counter() - start
+    print("Series.apply: {:.2f}s".format(apply_elapsed))
+
+    for num_workers in [1, 2, 4, os.cpu_count()]:
+        with VaderSentimentAnalyzer(num_workers=num_workers) as analyzer:
+            start = time.perf_counter()
+            analyzer.calculate_sentiment(data.copy())
+            elapsed = time.perf_counter() - start
+        print(
+            "workers: {:>2}  {:.2f}s  speedup: {:.1f}x".format(
+                num_workers, elapsed, apply_elapsed / elapsed
+            )
+        )
@@ -0,0 +1,167 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from data_storage.sqlite_query import select_in_chunks
+
+
+# Name of granularity and its pandas frequency
+GRANULARITIES = {"1h": "1H", "3h": "3H", "1d": "1D"}
+
+
+class RollupStore:
+    """Store of per-ticker rollups of reddit data at several UTC time
+    granularities: number of mentions, sum of score and sum of sentiment
+    score in every time bucket. Rollups are updated incrementally with new
+    data and persisted to a pickle file
+
+    The sentiment score of a row is the label predicted by Model, 1 positive
+    and 0 negative, so its sum is the number of positive mentions
+
+    Incremental scrapes emit a submission again whenever it has new comments,
+    so if key_db_path is set, the keys of rows added are kept in a sqlite
+    database apart from the rollups and rows with a key already added are
+    skipped. A row is counted with the values it had when first added.
+    Readers of the rollups, e.g. the dashboard, leave key_db_path unset
+
+    Args:
+        path (str): path of pickle file, loaded if it exists
+        key_db_path (str): path of sqlite database of keys of rows added,
+                        None to add every row given to update
+    """
+
+    value_columns = ["mentions", "score", "sentiment_score"]
+    key_columns = ["type", "id", "ticker"]
+
+    def __init__(self, path: str, key_db_path: str = None):
+        """Constructor method"""
+        self.path = path
+        self.key_connection = None
+        self.pending_keys = set()
+        if key_db_path is not None:
+            self.key_connection = sqlite3.connect(key_db_path)
+            with self.key_connection:
+                self.key_connection.execute(
+                    "CREATE TABLE IF NOT EXISTS rollup_key (key TEXT PRIMARY KEY)"
+                )
+
+        if os.path.exists(path):
+            self.rollups = pd.read_pickle(path)
+        else:
+            self.rollups = {
+                granularity: self.create_rollup_df() for granularity in GRANULARITIES
+            }
+
+    def create_rollup_df(self) -> pd.DataFrame:
+        """Create empty rollup indexed by ticker and time bucket
+
+        Returns:
+            pd.DataFrame: empty rollup
+        """
+        index = pd.MultiIndex.from_arrays(
+            [pd.Index([], dtype=object), pd.DatetimeIndex([], tz="UTC")],
+            names=["ticker", "datetime"],
+        )
+        return pd.DataFrame(columns=self.value_columns, index=index, dtype=float)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """Add rows of new data to rollups. If key_db_path is set, rows with
+        a type, id and ticker already added are skipped
+
+        Args:
+            df (pd.DataFrame): DataFrame from RedditData.create_data, with
+                            optional sentiment_score column
+        """
+        df = df[df["ticker"].notna()]
+        if self.key_connection is not None:
+            df = df.drop_duplicates(self.key_columns)
+            df = df.loc[self.filter_new_keys(df)]
+        if df.empty:
+            return
+
+        datetime = pd.to_datetime(df["created_utc"], unit="s", utc=True)
+        values = pd.DataFrame(
+            {
+                "ticker": df["ticker"].values,
+                "mentions": 1,
+                "score": df["score"].values,
+                "sentiment_score": (
+                    df["sentiment_score"].values if "sentiment_score" in df else 0.0
+                ),
+            }
+        )
+
+        for granularity, freq in GRANULARITIES.items():
+            values["datetime"] = datetime.dt.floor(freq).array
+            groups = values.groupby(["ticker", "datetime"])
+            new_rollup = groups[self.value_columns].sum()
+            rollup = self.rollups[granularity].add(new_rollup, fill_value=0)
+            self.rollups[granularity] = rollup.sort_index()
+
+    def filter_new_keys(self, df: pd.DataFrame) -> np.ndarray:
+        """Find rows whose key has not been added, and queue their keys to be
+        recorded by save
+
+        Args:
+            df (pd.DataFrame): DataFrame with type, id and ticker columns,
+                            without duplicate keys
+
+        Returns:
+            np.ndarray: boolean array, True for rows not added before
+        """
+        keys = [
+            ":".join(map(str, key))
+            for key in zip(*(df[column] for column in self.key_columns))
+        ]
+        rows = select_in_chunks(
+            self.key_connection, "SELECT key FROM rollup_key WHERE key IN ({})", keys
+        )
+        # Keys added earlier in this run are not recorded until save
+        seen_keys = {row[0] for row in rows} | self.pending_keys
+        is_new = np.array([key not in seen_keys for key in keys], dtype=bool)
+        self.pending_keys.update(key for key in keys if key not in seen_keys)
+
+        return is_new
+
+    def save(self) -> None:
+        """Persist rollups to pickle file, then record keys of rows added"""
+        pd.to_pickle(self.rollups, self.path)
+        if self.key_connection is not None:
+            with self.key_connection:
+                self.key_connection.executemany(
+                    "INSERT OR IGNORE INTO rollup_key (key) VALUES (?)",
+                    [(key,) for key in self.pending_keys],
+                )
+            self.pending_keys = set()
+
+    def lookup(self, ticker: str, granularity: str) -> pd.DataFrame:
+        """Return rollup of ticker at granularity, with buckets without
+        mentions between its first and last bucket filled with 0
+
+        Args:
+            ticker (str): ticker symbol
+            granularity (str): one of GRANULARITIES
+
+        Returns:
+            pd.DataFrame: rollup of ticker indexed by time bucket
+        """
+        try:
+            rollup = self.rollups[granularity].xs(ticker, level="ticker")
+        except KeyError:
+            return self.create_rollup_df().droplevel("ticker")
+
+        return rollup.asfreq(GRANULARITIES[granularity], fill_value=0)
+
+    def top_tickers(self, num_tickers: int) -> list:
+        """Return tickers with the most mentions
+
+        Args:
+            num_tickers (int): number of tickers to return
+
+        Returns:
+            list: list of ticker symbols, most mentioned first
+        """
+        mentions = self.rollups["1d"].groupby(level="ticker")["mentions"].sum()
+        return list(mentions.nlargest(num_tickers).index)
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+
+# Name of trailing window and its length in hours
+WINDOWS = {"1h": 1, "24h": 24, "7d": 7 * 24}
+
+
+class TickerSignals:
+    """Engine turning ticker mentions into per-ticker hourly time series:
+    mentions, score, sentiment, score weighted sentiment and unique authors
+    of every UTC hour a ticker is mentioned in, and the same signals over
+    trailing windows ending at that hour
+
+    Tickers and authors are integer coded and every (ticker, hour) bucket is
+    a single int64 key, so buckets are aggregated with np.unique and
+    np.bincount. Windows are differences of cumulative sums found with
+    np.searchsorted, and unique authors of a window count the authors whose
+    merged activity intervals cover the hour. Only hours with mentions are
+    kept, so cost grows with mentions rather than tickers times hours
+
+    Args:
+        windows (dict): mapping of window name to length in hours
+    """
+
+    def __init__(self, windows: dict = None):
+        """Constructor method"""
+        self.windows = WINDOWS if windows is None else windows
+
+    def compute(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute signals of mention table
+
+        Args:
+            df (pd.DataFrame): DataFrame from RedditData.create_data with
+                            optional sentiment_score column
+
+        Returns:
+            pd.DataFrame: signals indexed by ticker and UTC hour
+        """
+        df = df[df["ticker"].notna()]
+        ticker_codes, tickers = pd.factorize(df["ticker"], sort=True)
+        author_codes = pd.factorize(df["author"])[0]
+        score = df["score"].to_numpy(dtype=np.float64)
+        if "sentiment_score" in df:
+            sentiment = df["sentiment_score"].to_numpy(dtype=np.float64)
+        else:
+            sentiment = np.zeros(len(df))
+
+        return self.compute_codes(
+            ticker_codes,
+            pd.Index(tickers, name="ticker"),
+            df["created_utc"].to_numpy(dtype=np.int64),
+            author_codes,
+            score,
+            sentiment,
+        )
+
+    def compute_codes(
+        self,
+        ticker_codes: np.ndarray,
+        tickers: pd.Index,
+        created_utc: np.ndarray,
+        author_codes: np.ndarray,
+        score: np.ndarray,
+        sentiment: np.ndarray,
+    ) -> pd.DataFrame:
+        """Compute signals of integer coded mentions
+
+        Args:
+            ticker_codes (np.ndarray): code of ticker of each mention, indexing
+                                    into tickers
+            tickers (pd.Index): ticker symbol of each code
+            created_utc (np.ndarray): int64 epoch seconds of each mention
+            author_codes (np.ndarray): code of author of each mention, -1 for
+                                    deleted authors
+            score (np.ndarray): reddit score of each mention
+            sentiment (np.ndarray): sentiment score of each mention
+
+        Returns:
+            pd.DataFrame: signals indexed by ticker and UTC hour
+        """
+        hours = created_utc // 3600
+        first_hour = int(hours.min()) if len(hours) else 0
+        last_hour = int(hours.max()) if len(hours) else 0
+        # Stride leaves room after the last hour, so that a window never
+        # reaches into the hours of the next ticker
+        stride = last_hour - first_hour + 1 + max(self.windows.values())
+        keys = ticker_codes.astype(np.int64) * stride + (hours - first_hour)
+
+        bucket_keys, bucket_of_mention = np.unique(keys, return_inverse=True)
+        num_buckets = len(bucket_keys)
+        mentions = np.bincount(bucket_of_mention, minlength=num_buckets)
+        sums = {
+            "score": np.bincount(bucket_of_mention, score, num_buckets),
+            "abs_score": np.bincount(bucket_of_mention, np.abs(score), num_buckets),
+            "sentiment_score": np.bincount(bucket_of_mention, sentiment, num_buckets),
+            "weighted_sentiment_score": np.bincount(
+                bucket_of_mention, score * sentiment, num_buckets
+            ),
+        }
+
+        # Distinct (ticker, hour, author) triples, deleted authors excluded
+        has_author = author_codes >= 0
+        num_authors = int(author_codes.max()) + 1 if has_author.any() else 1
+        author_keys = np.unique(
+            keys[has_author] * num_authors + author_codes[has_author]
+        )
+        unique_authors = np.bincount(
+            np.searchsorted(bucket_keys, author_keys // num_authors),
+            minlength=num_buckets,
+        )
+
+        signals = pd.DataFrame(
+            {
+                "mentions": mentions,
+                "score": sums["score"],
+                "sentiment_score": sums["sentiment_score"],
+                "weighted_sentiment_score": sums["weighted_sentiment_score"],
+                "unique_authors": unique_authors,
+            }
+        )
+
+        cumsums = {
+            name: np.concatenate([[0], np.cumsum(values)])
+            for name, values in [
+                ("mentions", mentions),
+                ("abs_score", sums["abs_score"]),
+                ("weighted_sentiment_score", sums["weighted_sentiment_score"]),
+            ]
+        }
+        for name, length in self.windows.items():
+            # Buckets from the first key inside the window to the bucket itself
+            offsets = bucket_keys % stride
+            start_keys = bucket_keys - np.minimum(offsets, length - 1)
+            starts = np.searchsorted(bucket_keys, start_keys, side="left")
+            ends = np.arange(1, num_buckets + 1)
+            window_sums = {
+                column: cumsum[ends] - cumsum[starts]
+                for column, cumsum in cumsums.items()
+            }
+            signals["mentions_" + name] = window_sums["mentions"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                signals["weighted_sentiment_" + name] = np.where(
+                    window_sums["abs_score"] > 0,
+                    window_sums["weighted_sentiment_score"]
+                    / window_sums["abs_score"],
+                    np.nan,
+                )
+            signals["unique_authors_" + name] = self.count_window_authors(
+                bucket_keys, author_keys, num_authors, stride, length
+            )
+
+        signals.index = pd.MultiIndex.from_arrays(
+            [
+                tickers[bucket_keys // stride],
+                pd.to_datetime(
+                    (bucket_keys % stride + first_hour) * 3600, unit="s", utc=True
+                ),
+            ],
+            names=["ticker", "datetime"],
+        )
+
+        return signals
+
+    def count_window_authors(
+        self,
+        bucket_keys: np.ndarray,
+        author_keys: np.ndarray,
+        num_authors: int,
+        stride: int,
+        length: int,
+    ) -> np.ndarray:
+        """Count distinct authors mentioning the ticker of each bucket within
+        the window of length hours ending at the bucket
+
+        An author active at hour h covers hours h to h + length - 1. Covered
+        hours of an author are merged into disjoint intervals, so the count
+        of a bucket is the number of intervals starting at or before it
+        minus the number ending before it
+
+        Args:
+            bucket_keys (np.ndarray): sorted keys of (ticker, hour) buckets
+            author_keys (np.ndarray): sorted keys of distinct
+                                    (ticker, hour, author) triples
+            num_authors (int): number of author codes
+            stride (int): number of keys per ticker
+            length (int): length of window in hours
+
+        Returns:
+            np.ndarray: number of distinct authors of each bucket
+        """
+        # Order triples by ticker and author, then hour
+        bucket_key = author_keys // num_authors
+        author = author_keys % num_authors
+        order = np.lexsort((bucket_key, author, bucket_key // stride))
+        bucket_key = bucket_key[order]
+        author = author[order]
+
+        # Interval of a triple ends where the next triple of the same author
+        # and ticker starts, if that is sooner than the window
+        interval_ends = bucket_key + length
+        next_is_sooner = (author[1:] == author[:-1]) & (
+            bucket_key[1:] - bucket_key[:-1] < length
+        )
+        interval_ends[:-1] = np.where(
+            next_is_sooner, bucket_key[1:], interval_ends[:-1]
+        )
+
+        starts = np.sort(bucket_key)
+        ends = np.sort(interval_ends)
+
+        return np.searchsorted(starts, bucket_keys, side="right") - np.searchsorted(
+            ends, bucket_keys, side="right"
+        )
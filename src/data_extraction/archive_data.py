@@ -0,0 +1,422 @@
+import json
+import multiprocessing
+import os
+import pickle
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from functools import partial
+
+from data_storage.sqlite_query import select_in_chunks
+
+from .reddit_data import RedditData
+from .ticker_index import TickerIndex
+
+
+# Bytes decompressed per read, lines are split out of each read
+READ_SIZE = 2 ** 20
+# Pushshift dumps are compressed with long distance matching windows
+MAX_WINDOW_SIZE = 2 ** 31
+# Items kept per batch written to a shard file and passed on to the join
+BATCH_SIZE = 10000
+CREATED_UTC_REGEX = re.compile(rb'"created_utc":\s*"?(\d+)')
+
+
+def iter_lines(path: str, stats: dict):
+    """Stream lines of a zstd compressed NDJSON file, decompressing one block
+    of READ_SIZE bytes at a time
+
+    Args:
+        path (str): path of .zst file
+        stats (dict): counters of file, decompressed_bytes and lines are added
+
+    Yields:
+        bytes: line without newline
+    """
+    # optional dependency, only needed to read archives
+    import zstandard
+
+    decompressor = zstandard.ZstdDecompressor(max_window_size=MAX_WINDOW_SIZE)
+    with open(path, "rb") as compressed_file:
+        reader = decompressor.stream_reader(compressed_file)
+        remainder = b""
+        while True:
+            block = reader.read(READ_SIZE)
+            if not block:
+                break
+            stats["decompressed_bytes"] += len(block)
+            lines = (remainder + block).split(b"\n")
+            remainder = lines.pop()
+            stats["lines"] += len(lines)
+            yield from lines
+
+        if remainder.strip():
+            stats["lines"] += 1
+            yield remainder
+
+
+def scan_file(
+    path: str,
+    kind: str,
+    subreddit_regex: "re.Pattern",
+    subreddits: frozenset,
+    start_utc: int = None,
+    end_utc: int = None,
+    shard_dir: str = None,
+    batch_size: int = BATCH_SIZE,
+) -> tuple:
+    """Read items of subreddits from an archive file into a shard file. Lines
+    are matched against the subreddit and created_utc filters as raw bytes,
+    and only lines passing them are parsed as JSON. Kept items are written
+    to the shard file as pickled lists of up to batch_size items, so memory
+    is bounded by a batch rather than by the items kept from the file
+
+    Args:
+        path (str): path of .zst file
+        kind (str): "submission" for RS files, "comment" for RC files
+        subreddit_regex (re.Pattern): bytes pattern matching the subreddit
+                                    field of wanted lines
+        subreddits (frozenset): lowercase names of wanted subreddits
+        start_utc (int): earliest created_utc of comments kept, None for no limit
+        end_utc (int): created_utc after which comments are dropped, None for
+                    no limit
+        shard_dir (str): directory of shard file, None for the default
+                    temporary directory
+        batch_size (int): number of items per batch
+
+    Returns:
+        tuple: path of shard file, read with read_shard, and dict of file
+            stats. Submission items are submission info tuples as built by
+            RedditData.save_submission, comment items are tuples of
+            submission id and comment info as built by RedditData.save_comment
+    """
+    start = time.perf_counter()
+    stats = {
+        "path": path,
+        "kind": kind,
+        "compressed_bytes": os.path.getsize(path),
+        "decompressed_bytes": 0,
+        "lines": 0,
+        "parsed": 0,
+        "kept": 0,
+    }
+    filter_time = kind == "comment" and (start_utc is not None or end_utc is not None)
+
+    file, shard_path = tempfile.mkstemp(suffix=".pkl", dir=shard_dir)
+    with os.fdopen(file, "wb") as shard_file:
+        items = []
+        for line in iter_lines(path, stats):
+            if not subreddit_regex.search(line):
+                continue
+            if filter_time:
+                match = CREATED_UTC_REGEX.search(line)
+                created_utc = int(match.group(1)) if match else None
+                if created_utc is None or not is_in_range(
+                    created_utc, start_utc, end_utc
+                ):
+                    continue
+
+            stats["parsed"] += 1
+            item = json.loads(line)
+            # Prefilters match raw text, so check the parsed fields again
+            if str(item.get("subreddit", "")).lower() not in subreddits:
+                continue
+            if kind == "submission":
+                items.append(submission_info(item))
+            elif str(item.get("link_id", "")).startswith("t3_"):
+                if filter_time and not is_in_range(
+                    int(item["created_utc"]), start_utc, end_utc
+                ):
+                    continue
+                items.append((item["link_id"][3:], comment_info(item)))
+
+            if len(items) >= batch_size:
+                pickle.dump(items, shard_file, pickle.HIGHEST_PROTOCOL)
+                stats["kept"] += len(items)
+                items = []
+
+        if items:
+            pickle.dump(items, shard_file, pickle.HIGHEST_PROTOCOL)
+            stats["kept"] += len(items)
+
+    stats["seconds"] = time.perf_counter() - start
+
+    return shard_path, stats
+
+
+def read_shard(shard_path: str):
+    """Read batches of a shard file written by scan_file, removing the file
+    once read
+
+    Yields:
+        list: list of items of a batch
+    """
+    try:
+        with open(shard_path, "rb") as shard_file:
+            while True:
+                try:
+                    yield pickle.load(shard_file)
+                except EOFError:
+                    return
+    finally:
+        os.remove(shard_path)
+
+
+def is_in_range(created_utc: int, start_utc: int, end_utc: int) -> bool:
+    """Return whether created_utc is within [start_utc, end_utc)"""
+    if start_utc is not None and created_utc < start_utc:
+        return False
+    if end_utc is not None and created_utc >= end_utc:
+        return False
+    return True
+
+
+def author_name(author: str) -> str:
+    """Return name of author, None if author is deleted as praw does"""
+    return None if author in (None, "[deleted]") else author
+
+
+def submission_info(item: dict) -> tuple:
+    """Return submission info tuple of a parsed RS line, ordered as the
+    submission columns of RedditData.initial_col_names. Dumps hold null
+    values for some fields, which are replaced as praw does"""
+    return (
+        item.get("title") or "",
+        author_name(item.get("author")),
+        item.get("selftext") or "",
+        item.get("score") or 0,
+        item["id"],
+        int(item["created_utc"]),
+        item["subreddit"],
+    )
+
+
+def comment_info(item: dict) -> tuple:
+    """Return comment info tuple of a parsed RC line, ordered as the comment
+    columns of RedditData.initial_col_names. Null values are replaced as in
+    submission_info"""
+    return (
+        author_name(item.get("author")),
+        item.get("body") or "",
+        int(item["created_utc"]),
+        item["id"],
+        item.get("score") or 0,
+    )
+
+
+class ArchiveData(RedditData):
+    """Reddit data read from Pushshift style monthly dumps of zstd compressed
+    NDJSON instead of Reddit's API, to backfill history. Records are the
+    same as those extracted from the API, so create_data, create_data_chunks
+    and create_compact_data work as in RedditData
+
+    Submission files (RS_*.zst) are read first into a temporary sqlite index
+    of the submission info of each submission of subreddit_list. Comment
+    files (RC_*.zst) are then read and joined to their submission. Comments
+    of submissions not found in submission_paths are skipped and counted as
+    orphaned, so include the submission file of the previous month to keep
+    comments of submissions created at the end of it. The time filter
+    applies to comments only
+
+    Files are read by a pool of num_workers spawned processes, one file per
+    process at a time. Workers write kept items to shard files in batches of
+    batch_size, which are read back one batch at a time, so memory is
+    bounded by batches rather than by the size of a file. Stats of each
+    file, including throughput in MB/s, are kept in archive_stats
+
+    Args:
+        submission_paths (list): list of paths of submission dump files
+        comment_paths (list): list of paths of comment dump files
+        subreddit_list (list): list of subreddit str to extract data
+        ticker_index (TickerIndex): index of ticker symbols used to extract ticker
+        start_utc (int): earliest created_utc of comments kept, None for no limit
+        end_utc (int): created_utc after which comments are dropped, None for
+                    no limit
+        num_workers (int): number of worker processes, 1 reads in process
+        batch_size (int): number of items per batch
+    """
+
+    def __init__(
+        self,
+        submission_paths: list,
+        comment_paths: list,
+        subreddit_list: list,
+        ticker_index: TickerIndex,
+        start_utc: int = None,
+        end_utc: int = None,
+        num_workers: int = 1,
+        batch_size: int = BATCH_SIZE,
+    ):
+        """Constructor method"""
+        super().__init__(None, subreddit_list, 0, ticker_index)
+        self.submission_paths = submission_paths
+        self.comment_paths = comment_paths
+        self.start_utc = start_utc
+        self.end_utc = end_utc
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.archive_stats = []
+        self.num_orphaned = 0
+        self.elapsed = 0.0
+
+        names = [name.encode("utf-8") for name in subreddit_list]
+        self.subreddit_regex = re.compile(
+            rb'"subreddit":\s*"(?:' + b"|".join(map(re.escape, names)) + rb')"',
+            re.IGNORECASE,
+        )
+        self.subreddits = frozenset(name.lower() for name in subreddit_list)
+
+    def extract_data_chunks(self, chunk_size: int):
+        """Streaming version of extract_data. Comments of a submission are
+        spread across dump files, so unlike RedditData a chunk may contain
+        part of the comments of a submission
+
+        Args:
+            chunk_size (int): number of comments per chunk, except for the
+                            last chunk
+
+        Yields:
+            pd.DataFrame: DataFrame with initial_col_names columns of a chunk
+                        of comments
+        """
+        records = []
+        for batch_records in self.iter_submission_records():
+            records += batch_records
+            num_full = len(records) // chunk_size * chunk_size
+            for i in range(0, num_full, chunk_size):
+                yield self.records_to_df(records[i : i + chunk_size])
+            records = records[num_full:]
+
+        if records:
+            yield self.records_to_df(records)
+
+    def iter_submission_records(self):
+        """Read archive files, one batch of comments at a time
+
+        Yields:
+            list: list of row tuples of a batch of comments, ordered as
+                initial_col_names
+        """
+        start = time.perf_counter()
+        # The pipeline creates its model before scraping, so fork would copy
+        # a parent with torch loaded into every scan worker
+        context = multiprocessing.get_context("spawn")
+        pool = context.Pool(self.num_workers) if self.num_workers > 1 else None
+        shard_dir = tempfile.mkdtemp(prefix="archive-")
+        connection = sqlite3.connect(os.path.join(shard_dir, "submission.db"))
+        try:
+            # Columns are ordered as submission info
+            connection.execute(
+                "CREATE TABLE submission (title TEXT, author TEXT, body TEXT, "
+                "score INTEGER, id TEXT PRIMARY KEY, created_utc INTEGER, "
+                "subreddit TEXT)"
+            )
+            for shard_path in self.scan_files(
+                pool, self.submission_paths, "submission", shard_dir
+            ):
+                for items in read_shard(shard_path):
+                    with connection:
+                        connection.executemany(
+                            "INSERT OR REPLACE INTO submission "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            items,
+                        )
+
+            for shard_path in self.scan_files(
+                pool, self.comment_paths, "comment", shard_dir
+            ):
+                for items in read_shard(shard_path):
+                    submissions = self.find_submissions(
+                        connection, list({submission_id for submission_id, _ in items})
+                    )
+                    records = []
+                    for submission_id, info in items:
+                        submission = submissions.get(submission_id)
+                        if submission is None:
+                            self.num_orphaned += 1
+                        else:
+                            records.append(submission + info)
+                    yield records
+        finally:
+            # Results of files not read yet are not needed any more
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            connection.close()
+            shutil.rmtree(shard_dir, ignore_errors=True)
+            self.elapsed += time.perf_counter() - start
+
+    def find_submissions(
+        self, connection: sqlite3.Connection, submission_ids: list
+    ) -> dict:
+        """Look up submission info of submission ids in the submission index
+
+        Args:
+            connection (sqlite3.Connection): connection to submission index
+            submission_ids (list): list of submission id str
+
+        Returns:
+            dict: mapping of submission id to submission info tuple, for ids
+                found
+        """
+        rows = select_in_chunks(
+            connection, "SELECT * FROM submission WHERE id IN ({})", submission_ids
+        )
+        # Submission id is the fifth field of submission info
+        return {row[4]: row for row in rows}
+
+    def scan_files(self, pool, paths: list, kind: str, shard_dir: str):
+        """Scan files in pool, or in process if pool is None, recording stats
+
+        Yields:
+            str: path of shard file of each file, in order of paths
+        """
+        scan = partial(
+            scan_file,
+            kind=kind,
+            subreddit_regex=self.subreddit_regex,
+            subreddits=self.subreddits,
+            start_utc=self.start_utc,
+            end_utc=self.end_utc,
+            shard_dir=shard_dir,
+            batch_size=self.batch_size,
+        )
+        results = map(scan, paths) if pool is None else pool.imap(scan, paths)
+        for shard_path, stats in results:
+            stats["decompressed_mb_per_s"] = (
+                stats["decompressed_bytes"] / 2 ** 20 / stats["seconds"]
+                if stats["seconds"]
+                else 0.0
+            )
+            self.archive_stats.append(stats)
+            yield shard_path
+
+    def summary(self) -> dict:
+        """Summarize stats of every file read
+
+        Returns:
+            dict: totals of bytes, lines, parsed and kept lines, orphaned
+                comments, and throughput over wall time in MB/s
+        """
+        totals = {
+            key: sum(stats[key] for stats in self.archive_stats)
+            for key in [
+                "compressed_bytes",
+                "decompressed_bytes",
+                "lines",
+                "parsed",
+                "kept",
+            ]
+        }
+        totals["files"] = len(self.archive_stats)
+        totals["orphaned"] = self.num_orphaned
+        totals["seconds"] = self.elapsed
+        for name in ["compressed", "decompressed"]:
+            megabytes = totals[name + "_bytes"] / 2 ** 20
+            totals[name + "_mb_per_s"] = (
+                megabytes / self.elapsed if self.elapsed else 0.0
+            )
+
+        return totals
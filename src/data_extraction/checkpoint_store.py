@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+
+from data_storage.sqlite_query import select_in_chunks
+
+
+class CheckpointStore:
+    """SQLite store of reddit content already extracted, used to scrape
+    incrementally. Keeps seen submission ids with their comment count, seen
+    comment ids and the latest created_utc of each subreddit. Comments are
+    only recorded by id, so edits made after a comment was extracted are not
+    detected
+
+    Args:
+        db_path (str): path of sqlite database file, created if missing
+    """
+
+    def __init__(self, db_path: str):
+        """Constructor method"""
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS submission (
+                    id TEXT PRIMARY KEY,
+                    num_comments INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS comment (
+                    id TEXT PRIMARY KEY
+                );
+                CREATE TABLE IF NOT EXISTS subreddit (
+                    name TEXT PRIMARY KEY,
+                    last_created_utc REAL NOT NULL
+                );
+                """
+            )
+
+    def is_submission_changed(self, submission_id: str, num_comments: int) -> bool:
+        """Check if submission is new or has a different number of comments
+        since it was last extracted
+
+        Args:
+            submission_id (str): id of submission
+            num_comments (int): current number of comments of submission
+
+        Returns:
+            bool: True if submission should be extracted again
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT num_comments FROM submission WHERE id = ?", (submission_id,)
+            ).fetchone()
+
+        return row is None or row[0] != num_comments
+
+    def filter_new_comment_ids(self, comment_ids: list) -> set:
+        """Return comment ids which have not been extracted before
+
+        Args:
+            comment_ids (list): list of comment id str
+
+        Returns:
+            set: set of comment ids not found in store
+        """
+        with self.lock:
+            rows = select_in_chunks(
+                self.connection, "SELECT id FROM comment WHERE id IN ({})", comment_ids
+            )
+            seen_ids = {row[0] for row in rows}
+
+        return set(comment_ids) - seen_ids
+
+    def get_last_created_utc(self, subreddit_name: str) -> float:
+        """Return created_utc of latest submission extracted from subreddit
+
+        Args:
+            subreddit_name (str): name of subreddit
+
+        Returns:
+            float: created_utc, None if subreddit has not been extracted
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT last_created_utc FROM subreddit WHERE name = ?",
+                (subreddit_name,),
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def save(
+        self, submissions: list, comment_ids: list, last_created_utc: dict
+    ) -> None:
+        """Record extracted content in a single transaction
+
+        Args:
+            submissions (list): list of (submission id, num_comments) tuples
+            comment_ids (list): list of extracted comment id str
+            last_created_utc (dict): mapping of subreddit name to created_utc
+                                    of latest submission extracted
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO submission (id, num_comments) VALUES (?, ?)",
+                submissions,
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO comment (id) VALUES (?)",
+                [(comment_id,) for comment_id in comment_ids],
+            )
+            self.connection.executemany(
+                "INSERT INTO subreddit (name, last_created_utc) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET last_created_utc = "
+                "MAX(last_created_utc, excluded.last_created_utc)",
+                list(last_created_utc.items()),
+            )
+
+    def close(self) -> None:
+        """Close connection to database"""
+        self.connection.close()
@@ -0,0 +1,204 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+# praw is slow to import and only needed for type annotations here
+if TYPE_CHECKING:
+    import praw
+
+
+class ExpansionBudget:
+    """Budget of MoreComments requests and seconds shared by every submission
+    of a run. Thread safe, the clock starts at the first request
+
+    Args:
+        max_requests (int): maximum number of MoreComments requests, None for
+                        no limit
+        max_seconds (float): maximum seconds spent expanding comment trees
+                        since the first request, None for no limit
+    """
+
+    def __init__(self, max_requests: int = None, max_seconds: float = None):
+        """Constructor method"""
+        self.max_requests = max_requests
+        self.max_seconds = max_seconds
+        self.num_requests = 0
+        self.start = None
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Reserve one request
+
+        Returns:
+            bool: True if the request fits into the budget
+        """
+        with self.lock:
+            if self.start is None:
+                self.start = time.perf_counter()
+            if self.max_requests is not None and self.num_requests >= self.max_requests:
+                return False
+            if (
+                self.max_seconds is not None
+                and time.perf_counter() - self.start >= self.max_seconds
+            ):
+                return False
+            self.num_requests += 1
+
+            return True
+
+
+class CommentExpander:
+    """Budgeted alternative to replace_more(limit=None), which expands the
+    whole comment tree of a submission whatever the number of requests.
+    MoreComments placeholders are expanded highest parent score first, and
+    expansion of a submission stops once max_more_per_submission requests
+    are made or the shared budget runs out. Placeholders deeper than
+    max_depth are never expanded
+
+    Stats of every expanded submission are kept in stats, to trade coverage
+    of comment trees for latency
+
+    Args:
+        max_more_per_submission (int): maximum number of MoreComments requests
+                        per submission, None for no limit
+        max_depth (int): maximum depth of expanded MoreComments, top level
+                        comments are at depth 0. None for no limit
+        budget (ExpansionBudget): budget shared across submissions, None for
+                        no limit
+        more_comments_type (type): class of MoreComments placeholders,
+                        praw.models.MoreComments if None
+    """
+
+    def __init__(
+        self,
+        max_more_per_submission: int = None,
+        max_depth: int = None,
+        budget: ExpansionBudget = None,
+        more_comments_type: type = None,
+    ):
+        """Constructor method"""
+        if more_comments_type is None:
+            from praw.models import MoreComments
+
+            more_comments_type = MoreComments
+
+        self.max_more_per_submission = max_more_per_submission
+        self.max_depth = max_depth
+        self.budget = budget
+        self.more_comments_type = more_comments_type
+        self.stats = []
+
+    def expand(self, submission: "praw.models.Submission") -> tuple:
+        """Expand comment tree of submission within budget
+
+        Args:
+            submission (praw.models.Submission): submission to expand
+
+        Returns:
+            tuple: list of praw.models.Comment fetched, comments of the
+                initial tree first, and dict of expansion stats
+        """
+        start = time.perf_counter()
+        comments = []
+        seen_ids = set()
+        scores = {}
+        depths = {}
+        queue = []
+        counter = itertools.count()
+        num_skipped = 0
+
+        def parent_depth(parent_id: str) -> int:
+            if parent_id.startswith("t3_"):
+                return -1
+            return depths.get(parent_id[3:], -1)
+
+        def add_items(items: list) -> int:
+            # Collect comments and queue placeholders of a forest, breadth first
+            skipped = 0
+            items = deque(items)
+            while items:
+                item = items.popleft()
+                if isinstance(item, self.more_comments_type):
+                    depth = parent_depth(item.parent_id) + 1
+                    if self.max_depth is not None and depth > self.max_depth:
+                        skipped += 1
+                        continue
+                    if item.parent_id.startswith("t3_"):
+                        priority = submission.score
+                    else:
+                        priority = scores.get(item.parent_id[3:], 0)
+                    entry = (-priority, -item.count, next(counter), item)
+                    heapq.heappush(queue, entry)
+                elif item.id not in seen_ids:
+                    seen_ids.add(item.id)
+                    scores[item.id] = item.score
+                    depths[item.id] = parent_depth(item.parent_id) + 1
+                    comments.append(item)
+                    items.extend(getattr(item, "replies", ()))
+
+            return skipped
+
+        num_skipped += add_items(submission.comments)
+
+        num_requests = 0
+        stop_reason = "complete"
+        while queue:
+            if (
+                self.max_more_per_submission is not None
+                and num_requests >= self.max_more_per_submission
+            ):
+                stop_reason = "submission_cap"
+                break
+            if self.budget is not None and not self.budget.acquire():
+                stop_reason = "budget"
+                break
+            more = heapq.heappop(queue)[-1]
+            num_requests += 1
+            num_skipped += add_items(more.comments())
+        if stop_reason == "complete" and num_skipped:
+            stop_reason = "depth_limit"
+
+        num_comments = submission.num_comments
+        stats = {
+            "submission_id": submission.id,
+            "num_comments": num_comments,
+            "fetched_comments": len(comments),
+            "coverage": min(len(comments) / num_comments, 1.0)
+            if num_comments
+            else 1.0,
+            "more_requests": num_requests,
+            "more_remaining": len(queue) + num_skipped,
+            "stop_reason": stop_reason,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        self.stats.append(stats)
+
+        return comments, stats
+
+    def summary(self) -> dict:
+        """Summarize stats of every expanded submission
+
+        Returns:
+            dict: totals of comments, fetched comments and requests, and
+                number of submissions per stop reason
+        """
+        num_comments = sum(stat["num_comments"] for stat in self.stats)
+        fetched_comments = sum(stat["fetched_comments"] for stat in self.stats)
+        stop_reasons = {}
+        for stat in self.stats:
+            reason = stat["stop_reason"]
+            stop_reasons[reason] = stop_reasons.get(reason, 0) + 1
+
+        return {
+            "submissions": len(self.stats),
+            "num_comments": num_comments,
+            "fetched_comments": fetched_comments,
+            "coverage": min(fetched_comments / num_comments, 1.0)
+            if num_comments
+            else 1.0,
+            "more_requests": sum(stat["more_requests"] for stat in self.stats),
+            "stop_reasons": stop_reasons,
+        }
@@ -0,0 +1,122 @@
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from .ticker_index import TickerIndex
+
+
+class CompactRedditData:
+    """Compact representation of processed reddit data. Instead of a single
+    DataFrame with one row per ticker mention, data is held in three tables:
+
+    - posts: one row per submission or comment, repeated strings stored as
+        categoricals
+    - submissions: submission_title of each submission_id
+    - mentions: row position in posts and integer code of each ticker
+        mentioned, codes index into tickers
+
+    Args:
+        posts (pd.DataFrame): table of submissions and comments
+        submissions (pd.DataFrame): table of submission titles indexed by
+                                    submission_id
+        mentions (pd.DataFrame): table of ticker mentions
+        tickers (pd.Index): ticker symbol of each code
+        columns (list): column order of the exploded DataFrame
+    """
+
+    category_columns = ["submission_id", "subreddit", "author", "type"]
+
+    def __init__(
+        self,
+        posts: pd.DataFrame,
+        submissions: pd.DataFrame,
+        mentions: pd.DataFrame,
+        tickers: pd.Index,
+        columns: list,
+    ):
+        """Constructor method"""
+        self.posts = posts
+        self.submissions = submissions
+        self.mentions = mentions
+        self.tickers = tickers
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ticker_index: TickerIndex):
+        """Create compact data from cleaned text, before tickers are extracted
+
+        Args:
+            df (pd.DataFrame): DataFrame from RedditData.remove_unwanted_char
+            ticker_index (TickerIndex): index of ticker symbols used to extract
+                                        ticker
+
+        Returns:
+            CompactRedditData: compact data
+        """
+        df = df.reset_index(drop=True)
+        columns = list(df.columns) + ["ticker"]
+
+        # Normalize submission level fields into a side table
+        submissions = df[["submission_id", "submission_title"]].drop_duplicates(
+            "submission_id"
+        )
+        submissions = submissions.set_index("submission_id")
+        posts = df.drop(columns=["submission_title"])
+        for column in cls.category_columns:
+            posts[column] = posts[column].astype("category")
+
+        # Integer coded mention table
+        tickers = pd.Index(sorted(ticker_index.tickers))
+        matches = ticker_index.match_many(posts["body"])
+        num_matches = np.fromiter(map(len, matches), dtype=np.int64, count=len(matches))
+        mentions = pd.DataFrame(
+            {
+                "post": np.repeat(np.arange(len(posts), dtype=np.int32), num_matches),
+                "ticker": tickers.get_indexer(list(chain.from_iterable(matches))),
+            }
+        )
+        mentions["ticker"] = mentions["ticker"].astype(np.int32)
+
+        return cls(posts, submissions, mentions, tickers, columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Expand into the DataFrame returned by RedditData.create_data, with
+        one row per ticker mention and rows without tickers kept once
+
+        Returns:
+            pd.DataFrame: exploded DataFrame
+        """
+        num_posts = len(self.posts)
+        post = self.mentions["post"].values
+        num_mentions = np.bincount(post, minlength=num_posts)
+        num_rows = np.maximum(num_mentions, 1)
+
+        # Position of each mention within the exploded rows
+        row_start = np.cumsum(num_rows) - num_rows
+        mention_start = np.cumsum(num_mentions) - num_mentions
+        rank = np.arange(len(post)) - mention_start[post]
+        ticker = np.full(num_rows.sum(), np.nan, dtype=object)
+        ticker[row_start[post] + rank] = self.tickers.values[
+            self.mentions["ticker"].values
+        ]
+
+        df = self.posts.iloc[np.repeat(np.arange(num_posts), num_rows)]
+        for column in self.category_columns:
+            df[column] = df[column].astype(object)
+        df = df.join(self.submissions, on="submission_id")
+        df["ticker"] = ticker
+
+        return df[self.columns].reset_index(drop=True)
+
+    def memory_usage(self) -> dict:
+        """Return memory used by each table in bytes
+
+        Returns:
+            dict: dict of bytes used by posts, submissions and mentions tables
+        """
+        return {
+            "posts": int(self.posts.memory_usage(deep=True).sum()),
+            "submissions": int(self.submissions.memory_usage(deep=True).sum()),
+            "mentions": int(self.mentions.memory_usage(deep=True).sum()),
+        }
@@ -1,10 +1,26 @@
+import random
 import re
-from datetime import datetime
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-import praw
 import pandas as pd
 
+from .checkpoint_store import CheckpointStore
+from .comment_expansion import CommentExpander
+from .compact_data import CompactRedditData
 from .ticker_data import TickerData
+from .ticker_index import TickerIndex
+
+# praw is slow to import and only needed for type annotations here
+if TYPE_CHECKING:
+    import praw
+
+
+# Emoji and punctuation marks, except $ sign
+UNWANTED_CHAR_REGEX = re.compile(r"[^\w\d\s\$]+")
 
 
 class RedditData:
@@ -14,58 +30,101 @@ class RedditData:
         reddit (praw.Reddit): Reddit class to access Reddit's API
         subreddit_list (list): list of subreddit str to extract data
         num_posts (int): number of new submissions to extract
-        ticker_list (list): list of ticker symbol str used to extract ticker
+        ticker_index (TickerIndex): index of ticker symbols used to extract ticker
+        max_workers (int): number of threads fetching subreddits and
+                        submissions concurrently, 1 fetches serially
+        max_retries (int): number of retries of a rate limited or failed request
+        backoff_seconds (float): initial delay before retrying, doubled on
+                        each retry unless Reddit specifies a retry-after delay
+        checkpoint_store (CheckpointStore): store of content already extracted.
+                        If provided, only new submissions, submissions with
+                        a changed comment count and unseen comments are
+                        extracted. Comments edited after they were extracted
+                        are not extracted again
+        refresh_seconds (float): with checkpoint_store, listing of a subreddit
+                        stops at submissions created more than refresh_seconds
+                        before the latest submission of the previous run,
+                        as their new comments are not extracted any more.
+                        None lists num_posts submissions and checks each
+        comment_expander (CommentExpander): budgeted expansion of comment
+                        trees. If None, comment trees are expanded fully
+        create_reddit (callable): function returning a new praw.Reddit, called
+                        once per worker thread. praw.Reddit is not thread
+                        safe, so set it when max_workers is more than 1. If
+                        None, reddit is shared by every worker thread
     """
 
     def __init__(
         self,
-        reddit: praw.Reddit,
+        reddit: "praw.Reddit",
         subreddit_list: list,
         num_posts: int,
-        ticker_list: list,
+        ticker_index: TickerIndex,
+        max_workers: int = 1,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+        checkpoint_store: CheckpointStore = None,
+        comment_expander: CommentExpander = None,
+        create_reddit=None,
+        refresh_seconds: float = 86400.0,
     ):
         """Constructor method"""
         self.reddit = reddit
         self.subreddit_list = subreddit_list
         self.num_post = num_posts
-        self.ticker_list = ticker_list
+        self.ticker_index = ticker_index
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.checkpoint_store = checkpoint_store
+        self.comment_expander = comment_expander
+        self.create_reddit = create_reddit
+        self.refresh_seconds = refresh_seconds
+        self.thread_local = threading.local()
+        self.pending_submissions = []
+        self.pending_comment_ids = []
+        self.pending_last_created_utc = {}
         self.initial_col_names = [
             "submission_title",
             "submission_author",
             "submission_body",
             "submission_score",
             "submission_id",
-            "submission_datetime",
+            "submission_created_utc",
+            "submission_subreddit",
             "comment_author",
             "comment_body",
-            "comment_datetime",
+            "comment_created_utc",
             "comment_id",
             "comment_score",
         ]
         self.comment_columns = [
             "submission_title",
             "submission_id",
+            "submission_subreddit",
             "comment_author",
             "comment_body",
-            "comment_datetime",
+            "comment_created_utc",
             "comment_id",
             "comment_score",
         ]
         self.submission_columns = [
             "submission_title",
             "submission_id",
+            "submission_subreddit",
             "submission_author",
             "submission_body",
-            "submission_datetime",
+            "submission_created_utc",
             "submission_id",
             "submission_score",
         ]
         self.final_col_names = [
             "submission_title",
             "submission_id",
+            "subreddit",
             "author",
             "body",
-            "datetime",
+            "created_utc",
             "id",
             "score",
             "type",
@@ -81,131 +140,357 @@ class RedditData:
         Returns:
             pd.DataFrame: DataFrame containing extracted and transformed reddit text
         """
-        data = pd.DataFrame(columns=self.final_col_names)
-        for subreddit in self.subreddit_list:
-            subreddit_data = self.save_subreddit(
-                subreddit, self.num_post, self.initial_col_names
-            )
-            data = data.append(subreddit_data, ignore_index=True)
+        data = self.extract_data()
+        data = self.process_data(data)
+
+        return data
+
+    def create_compact_data(self) -> CompactRedditData:
+        """Same as create_data, but returns compact data with categorical
+        columns, a submission side table and an integer coded ticker mention
+        table instead of rows duplicated per ticker
+
+        Returns:
+            CompactRedditData: compact extracted and transformed reddit text
+        """
+        data = self.extract_data()
+        data = self.transform_data(data)
+        data = self.remove_unwanted_char(data)
+
+        return CompactRedditData.from_frame(data, self.ticker_index)
+
+    def create_data_chunks(self, chunk_size: int):
+        """Streaming version of create_data. Submissions are extracted and
+        processed in chunks of about chunk_size comments, so that memory stays
+        bounded and chunks are available before the scrape finishes. A chunk
+        always contains whole submissions
+
+        Args:
+            chunk_size (int): minimum number of comments per chunk, except
+                            for the last chunk
+
+        Yields:
+            pd.DataFrame: DataFrame containing extracted and transformed
+                        reddit text of a chunk of submissions
+        """
+        for data in self.extract_data_chunks(chunk_size):
+            yield self.process_data(data)
+
+    def extract_data_chunks(self, chunk_size: int):
+        """Streaming version of extract_data. A chunk always contains whole
+        submissions
+
+        Args:
+            chunk_size (int): minimum number of comments per chunk, except
+                            for the last chunk
+
+        Yields:
+            pd.DataFrame: DataFrame with initial_col_names columns of a chunk
+                        of submissions
+        """
+        records = []
+        for submission_records in self.iter_submission_records():
+            records += submission_records
+            if len(records) >= chunk_size:
+                yield self.records_to_df(records)
+                records = []
+
+        if records:
+            yield self.records_to_df(records)
+
+    def process_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Transform extracted data, remove unwanted characters and extract
+        ticker symbols
+
+        Args:
+            data (pd.DataFrame): DataFrame with initial_col_names columns
+
+        Returns:
+            pd.DataFrame: DataFrame containing transformed reddit text
+        """
         data = self.transform_data(data)
         data = self.remove_unwanted_char(data)
         data = self.extract_ticker(data)
 
         return data
 
-    def utc_to_datetime_str(self, utc: float) -> str:
-        """Convert utc to datetime string
+    def extract_data(self) -> pd.DataFrame:
+        """Extract reddit text of every subreddit in subreddit_list. Rows are
+        buffered as tuples across submissions and subreddits and converted
+        into a DataFrame once at the end
+
+        Returns:
+            pd.DataFrame: DataFrame with initial_col_names columns, one row
+                        per comment
+        """
+        records = []
+        for submission_records in self.iter_submission_records():
+            records += submission_records
+
+        return self.records_to_df(records)
+
+    def records_to_df(self, records: list) -> pd.DataFrame:
+        """Convert row tuples into a DataFrame
 
         Args:
-            utc (float): datetime represented in utc
+            records (list): list of row tuples ordered as initial_col_names
 
         Returns:
-            str: date time string
+            pd.DataFrame: DataFrame with initial_col_names columns
         """
+        return pd.DataFrame.from_records(records, columns=self.initial_col_names)
 
-        dt = datetime.fromtimestamp(utc)
-        date_time_str = dt.strftime("%m/%d/%Y, %H:%M:%S")
+    def iter_submission_records(self):
+        """Extract reddit text of every subreddit in subreddit_list, one
+        submission at a time. Subreddits and submissions are fetched by a pool
+        of max_workers threads, with at most 2 * max_workers submissions in
+        flight. Submissions are yielded in the order of subreddit_list and of
+        submissions within each subreddit
 
-        return date_time_str
+        Yields:
+            list: list of row tuples of a submission, ordered as initial_col_names
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            submission_lists = executor.map(
+                lambda subreddit: self.call_with_backoff(
+                    self.fetch_submissions, subreddit, self.num_post
+                ),
+                self.subreddit_list,
+            )
+            submissions = [
+                submission
+                for submission_list in submission_lists
+                for submission in submission_list
+            ]
+
+            # Keep a bounded window of futures, consumed in submission order
+            futures = deque()
+            for submission in submissions:
+                futures.append(
+                    executor.submit(
+                        self.call_with_backoff, self.save_submission, submission
+                    )
+                )
+                if len(futures) >= 2 * self.max_workers:
+                    yield futures.popleft().result()
+
+            while futures:
+                yield futures.popleft().result()
+
+    def commit_checkpoint(self) -> None:
+        """Record content extracted since the last commit in checkpoint_store.
+        Call after the extracted data has been persisted, so that a failed run
+        is extracted again on the next run
+        """
+        if self.checkpoint_store is None:
+            return
+
+        self.checkpoint_store.save(
+            self.pending_submissions,
+            self.pending_comment_ids,
+            self.pending_last_created_utc,
+        )
+        self.pending_submissions = []
+        self.pending_comment_ids = []
+        self.pending_last_created_utc = {}
+
+    def get_reddit(self) -> "praw.Reddit":
+        """Return the praw.Reddit of the calling thread, created by
+        create_reddit on first use, or the shared reddit if create_reddit is None
+
+        Returns:
+            praw.Reddit: Reddit class to access Reddit's API
+        """
+        if self.create_reddit is None:
+            return self.reddit
+        if not hasattr(self.thread_local, "reddit"):
+            self.thread_local.reddit = self.create_reddit()
+
+        return self.thread_local.reddit
+
+    def call_with_backoff(self, func, *args):
+        """Call func, retrying with exponential backoff and jitter when Reddit
+        rate limits the request or fails with a server or network error
+
+        Args:
+            func (callable): function making requests to Reddit's API
+            *args: arguments of func
+
+        Returns:
+            Any: return value of func
+        """
+        from prawcore.exceptions import RequestException, ServerError, TooManyRequests
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(*args)
+            except (TooManyRequests, ServerError, RequestException) as error:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_after(error)
+                if delay is None:
+                    delay = self.backoff_seconds * 2 ** attempt
+                    delay = delay + random.uniform(0, delay)
+                time.sleep(delay)
+
+    def retry_after(self, error: Exception) -> float:
+        """Return seconds to wait before retrying as specified by Reddit
+
+        Args:
+            error (Exception): error raised by prawcore
+
+        Returns:
+            float: delay in seconds, None if Reddit did not specify a valid one
+        """
+        # prawcore keeps the raw Retry-After header string
+        try:
+            delay = float(getattr(error, "retry_after", None))
+        except (TypeError, ValueError):
+            return None
 
-    def save_comment(self, comment: praw.models.Comment) -> list:
+        return delay if delay >= 0 else None
+
+    def author_name(self, author: "praw.models.Redditor") -> str:
+        """Return name of author, None if author is deleted
+
+        Args:
+            author (praw.models.Redditor): author of submission or comment
+
+        Returns:
+            str: name of author
+        """
+        return None if author is None else str(author)
+
+    def save_comment(self, comment: "praw.models.Comment") -> tuple:
         """Extract and return information of a reddit comment
 
         Args:
             comment (praw.models.Comment): A class that represents a reddit comment
 
         Returns:
-            list: list of string containing information of comment
+            tuple: tuple of string containing information of comment
         """
-        comment_author = comment.author
+        comment_author = self.author_name(comment.author)
         comment_body = comment.body
-        comment_utc = comment.created_utc
+        comment_created_utc = int(comment.created_utc)
         comment_id = comment.id
         comment_score = comment.score
-        comment_datetime = self.utc_to_datetime_str(comment_utc)
 
-        comment_info_list = [
+        comment_info = (
             comment_author,
             comment_body,
-            comment_datetime,
+            comment_created_utc,
             comment_id,
             comment_score,
-        ]
+        )
 
-        return comment_info_list
+        return comment_info
 
-    def save_submission(
-        self, submission: praw.models.Submission, col_names: list
-    ) -> pd.DataFrame:
+    def save_submission(self, submission: "praw.models.Submission") -> list:
         """Extract and return information about a reddit submission
 
         Args:
             submission (praw.models.Submission): A class that represents a
                                                 reddit submission
-            col_names (list): [description]: column names for the output dataframe
 
         Returns:
-            pd.DataFrame: DataFrame containing information about the
-                            comments within the submission
+            list: list of row tuples, one per comment within the submission,
+                ordered as initial_col_names
         """
 
-        # Initialise
-        submission_df = pd.DataFrame(columns=col_names)
+        # Submissions listed by another thread are bound to its praw.Reddit
+        if self.create_reddit is not None:
+            submission = self.get_reddit().submission(id=submission.id)
 
         # save params
         submission_title = submission.title
-        submission_author = submission.author
+        submission_author = self.author_name(submission.author)
         submission_body = submission.selftext
         submission_score = submission.score
         submission_id = submission.id
-        submission_utc = submission.created_utc
-        submission_datetime = self.utc_to_datetime_str(submission_utc)
+        submission_created_utc = int(submission.created_utc)
+        submission_subreddit = str(submission.subreddit)
 
-        submission_info_list = [
+        submission_info = (
             submission_title,
             submission_author,
             submission_body,
             submission_score,
             submission_id,
-            submission_datetime,
-        ]
+            submission_created_utc,
+            submission_subreddit,
+        )
 
         # Iterate through each comment to extract info - breadth first search
-        submission.comments.replace_more(limit=None)
-        for comment in submission.comments.list():
+        if self.comment_expander is None:
+            submission.comments.replace_more(limit=None)
+            comments = submission.comments.list()
+            is_complete = True
+        else:
+            comments, stats = self.comment_expander.expand(submission)
+            is_complete = stats["more_remaining"] == 0
+
+        # Keep only comments not extracted in previous runs
+        if self.checkpoint_store is not None:
+            new_ids = self.checkpoint_store.filter_new_comment_ids(
+                [comment.id for comment in comments]
+            )
+            comments = [comment for comment in comments if comment.id in new_ids]
+            # Partially expanded submissions are fetched again on the next run
+            num_comments = submission.num_comments if is_complete else -1
+            self.pending_submissions.append((submission_id, num_comments))
+            self.pending_comment_ids.extend(comment.id for comment in comments)
 
-            comment_info_list = self.save_comment(comment)
-            info_list = submission_info_list + comment_info_list
-            info_series = pd.Series(info_list, index=col_names)
-            submission_df = submission_df.append(info_series, ignore_index=True)
+        records = [submission_info + self.save_comment(comment) for comment in comments]
 
-        return submission_df
+        return records
 
-    def save_subreddit(
-        self, subreddit_name: str, extract_limit: int, col_names: list
-    ) -> pd.DataFrame:
-        """Extract and return information of subreddit specified
+    def fetch_submissions(self, subreddit_name: str, extract_limit: int) -> list:
+        """Fetch newest submissions of subreddit specified
 
         Args:
             subreddit_name (str): subreddit to extract data
             extract_limit (int): number of new posts to extract
-            col_names (list): column names of output dataframe
 
         Returns:
-            pd.DataFrame: DataFrame containing information of subreddt
+            list: list of praw.models.Submission, newest first. If
+                checkpoint_store is set, only new or changed submissions
+                within refresh_seconds of the previous run
         """
-        # Initialise empty table
-        subreddit_df = pd.DataFrame(columns=col_names)
-
         # Create subreddit instance
-        subreddit = self.reddit.subreddit(subreddit_name)
-
-        # Iterate through each submission to extract info
-        for submission in subreddit.new(limit=extract_limit):
-            submission_df = self.save_submission(submission, col_names)
-            subreddit_df = subreddit_df.append(submission_df, ignore_index=True)
+        subreddit = self.get_reddit().subreddit(subreddit_name)
+        listing = subreddit.new(limit=extract_limit)
+
+        # Stop listing once submissions are older than the previous run
+        # cursor minus refresh_seconds, saving the remaining listing requests
+        cutoff_utc = None
+        if self.checkpoint_store is not None and self.refresh_seconds is not None:
+            last_created_utc = self.checkpoint_store.get_last_created_utc(
+                subreddit_name
+            )
+            if last_created_utc is not None:
+                cutoff_utc = last_created_utc - self.refresh_seconds
+
+        submissions = []
+        for submission in listing:
+            if cutoff_utc is not None and submission.created_utc < cutoff_utc:
+                break
+            submissions.append(submission)
+
+        # Skip submissions unchanged since previous runs
+        if self.checkpoint_store is not None and submissions:
+            self.pending_last_created_utc[subreddit_name] = max(
+                submission.created_utc for submission in submissions
+            )
+            submissions = [
+                submission
+                for submission in submissions
+                if self.checkpoint_store.is_submission_changed(
+                    submission.id, submission.num_comments
+                )
+            ]
 
-        return subreddit_df
+        return submissions
 
     def transform_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Transform structure of data extracted so that it contains a single
@@ -232,7 +517,7 @@ class RedditData:
         df_submission.columns = self.final_col_names
 
         # Combine submission and comment df
-        df_combined = df_submission.append(df_comment, ignore_index=True)
+        df_combined = pd.concat([df_submission, df_comment], ignore_index=True)
 
         return df_combined
 
@@ -245,9 +530,8 @@ class RedditData:
         Returns:
             pd.DataFrame: DataFrame with unwanted characters removed in body column
         """
-        # Remove emoji, unwanted punctuation marks
-        regex = "[^\w\d\s\$]+"
-        df["body"] = df["body"].apply(lambda text: re.sub(regex, "", text))
+        # Remove emoji, unwanted punctuation marks over the whole column
+        df["body"] = df["body"].str.replace(UNWANTED_CHAR_REGEX, "", regex=True)
 
         return df
 
@@ -261,15 +545,12 @@ class RedditData:
             pd.DataFrame: DataFrane with ticker column containing ticker
                         symbols extracted
         """
-        # returns column of list
-        df["ticker"] = df["body"].apply(self.find_tickers_in_text)
+        # returns column of list, $ sign is removed by the ticker index
+        df["ticker"] = self.ticker_index.match_many(df["body"])
 
         # create multiple rows if multiple tickers in list
         df = df.explode("ticker").reset_index(drop=True)
 
-        # remove $ sign in extracted ticker
-        df["ticker"] = df["ticker"].str.replace("$", "", regex=True)
-
         return df
 
     def find_tickers_in_text(self, text: str) -> list:
@@ -281,11 +562,7 @@ class RedditData:
         Returns:
             list: list of ticker symbols extracted
         """
-        # Find intersection
-        text_set = set(text.split(" "))
-        tickers_in_text = text_set.intersection(self.ticker_list)
-
-        return list(tickers_in_text)
+        return self.ticker_index.match(text)
 
 
 if __name__ == "__main__":
@@ -296,10 +573,12 @@ if __name__ == "__main__":
     csv_path_list = [nasdaq_path, otc_path]
     exception_list = ["TD", "ANY", "CEO", "EV"]
     ticker_data = TickerData(csv_path_list, exception_list)
-    ticker_list = ticker_data.create_data()
+    ticker_index = ticker_data.create_data()
+
+    from praw import Reddit
 
-    reddit = praw.Reddit("DEFAULT")
-    reddit_data = RedditData(reddit, ["stocks"], 5, ticker_list)
+    reddit = Reddit("DEFAULT")
+    reddit_data = RedditData(reddit, ["stocks"], 5, ticker_index)
     reddit_data = reddit_data.create_data()
 
     print(reddit_data)
@@ -1,5 +1,14 @@
+import os
+import pickle
+
 import pandas as pd
 
+from .ticker_index import TickerIndex
+
+# Version of the cached ticker index, bumped whenever TickerIndex or the way
+# it is built changes so that stale caches are rebuilt
+CACHE_VERSION = 3
+
 
 class TickerData:
     """Ticker data object with csv_path and exception list.
@@ -8,28 +17,213 @@ class TickerData:
         Args:
             csv_path (list): list of path of csv files containing ticker info
             exception_list (list): list of ticker symbols to exclude
+            cache_path (str): path of pickle file caching the ticker index,
+                            None to disable caching. The cache is rebuilt
+                            when an input file or the exception list changes
+            word_list_path (str): path of text file of common English words
+                            and reddit slang, one per line. If provided,
+                            ambiguous tickers are only matched with $ sign,
+                            single character tickers are kept as such, and
+                            the ticker index holds the per-ticker metadata
     """
 
-    def __init__(self, csv_path_list: list, exception_list: list):
+    # Columns of screener csv files and their metadata column names
+    metadata_columns = {
+        "Symbol": "symbol",
+        "Name": "name",
+        "Security Name": "name",
+        "Market Cap": "market_cap",
+        "Volume": "volume",
+        "Vol": "volume",
+        "Sector": "sector",
+        "Tier": "tier",
+    }
+
+    def __init__(
+        self,
+        csv_path_list: list,
+        exception_list: list,
+        cache_path: str = None,
+        word_list_path: str = None,
+    ):
         """Constructor method"""
 
         self.csv_path_list = csv_path_list
         self.exception_list = exception_list
+        self.cache_path = cache_path
+        self.word_list_path = word_list_path
 
-    def create_data(self) -> list:
+    def create_data(self) -> TickerIndex:
         """
         1) Read ticker list from csv path specified
         2) Remove tickers in exception list
-        3) Create variations of ticker symbols
+        3) Find ambiguous tickers from ticker metadata, if word list is provided
+        4) Build ticker index, which includes variations of ticker symbols
+
+        Steps are skipped if an up to date ticker index is found in cache
 
         Returns:
-            list: list of ticker symbols
+            TickerIndex: index of ticker symbols used to match reddit text
         """
+        cache_key = self.create_cache_key()
+        ticker_index = self.read_cache(cache_key)
+        if ticker_index is not None:
+            return ticker_index
+
         ticker_list = self.read_ticker_file(self.csv_path_list, "Symbol")
-        ticker_list = self.remove_exceptions(ticker_list, self.exception_list)
-        ticker_list = self.create_variation(ticker_list)
+        if self.word_list_path is None:
+            ticker_list = self.remove_exceptions(ticker_list, self.exception_list)
+            ticker_index = TickerIndex(ticker_list)
+        else:
+            # Single character tickers are only matched with $ sign, e.g. $F
+            ticker_list = self.remove_exceptions(
+                ticker_list, self.exception_list, min_length=1
+            )
+            metadata = self.create_metadata()
+            metadata = metadata[metadata.index.isin(ticker_list)]
+            dollar_only_list = list(metadata.index[metadata["requires_dollar"]])
+            ticker_index = TickerIndex(ticker_list, dollar_only_list, metadata)
+        self.write_cache(cache_key, ticker_index)
 
-        return ticker_list
+        return ticker_index
+
+    def create_cache_key(self) -> tuple:
+        """Create key identifying the inputs of the ticker index
+
+        Returns:
+            tuple: cache version, path, modified time and size of each csv
+                file and word list, and exception list
+        """
+        input_paths = list(self.csv_path_list)
+        if self.word_list_path is not None:
+            input_paths.append(self.word_list_path)
+
+        file_keys = []
+        for csv_path in input_paths:
+            stat = os.stat(csv_path)
+            file_key = (os.path.abspath(csv_path), stat.st_mtime_ns, stat.st_size)
+            file_keys.append(file_key)
+
+        return CACHE_VERSION, tuple(file_keys), tuple(sorted(self.exception_list))
+
+    def read_cache(self, cache_key: tuple) -> TickerIndex:
+        """Read ticker index from cache
+
+        Args:
+            cache_key (tuple): key from create_cache_key
+
+        Returns:
+            TickerIndex: cached ticker index, None if cache is disabled,
+                        missing or out of date
+        """
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return None
+
+        # Caches written by other versions may fail to unpickle in many ways,
+        # e.g. AttributeError or ImportError of a renamed class
+        try:
+            with open(self.cache_path, "rb") as cache_file:
+                cached_key, ticker_index = pickle.load(cache_file)
+        except Exception:
+            return None
+
+        return ticker_index if cached_key == cache_key else None
+
+    def write_cache(self, cache_key: tuple, ticker_index: TickerIndex) -> None:
+        """Write ticker index to cache, replacing the file atomically
+
+        Args:
+            cache_key (tuple): key from create_cache_key
+            ticker_index (TickerIndex): ticker index to cache
+        """
+        if self.cache_path is None:
+            return
+
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "wb") as cache_file:
+            pickle.dump((cache_key, ticker_index), cache_file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.cache_path)
+
+    def create_metadata(self) -> pd.DataFrame:
+        """Create per-ticker metadata index from screener csv files, used to
+        tell tickers apart from common words
+
+        Returns:
+            pd.DataFrame: DataFrame indexed by symbol with name, market_cap,
+                        volume, sector, tier, liquidity_tier,
+                        is_english_word and requires_dollar columns
+        """
+        metadata = self.read_metadata_file(self.csv_path_list)
+        word_set = self.read_word_list(self.word_list_path)
+
+        # Liquidity tier from market cap or traded volume
+        market_cap = metadata["market_cap"].fillna(0)
+        volume = metadata["volume"].fillna(0)
+        liquidity_tier = pd.Series("low", index=metadata.index)
+        liquidity_tier[(market_cap >= 3e8) | (volume >= 1e5)] = "medium"
+        liquidity_tier[(market_cap >= 1e10) | (volume >= 1e6)] = "high"
+        metadata["liquidity_tier"] = pd.Categorical(
+            liquidity_tier, categories=["low", "medium", "high"], ordered=True
+        )
+
+        # Ambiguous tickers: English words, single characters, or illiquid
+        # tickers of 2 characters
+        metadata["is_english_word"] = metadata.index.str.lower().isin(word_set)
+        length = metadata.index.str.len()
+        is_short_illiquid = (length <= 2) & (metadata["liquidity_tier"] == "low")
+        metadata["requires_dollar"] = (
+            metadata["is_english_word"] | (length == 1) | is_short_illiquid
+        )
+
+        return metadata
+
+    def read_metadata_file(self, csv_path_list: list) -> pd.DataFrame:
+        """Read metadata columns of screener csv files. Tickers found in more
+        than one file keep metadata of the first file
+
+        Args:
+            csv_path_list (list): list of path of csv files containing ticker info
+
+        Returns:
+            pd.DataFrame: DataFrame indexed by symbol with name, market_cap,
+                        volume, sector and tier columns
+        """
+        metadata_list = []
+        for csv_path in csv_path_list:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            usecols = [column for column in header if column in self.metadata_columns]
+            metadata = pd.read_csv(
+                csv_path,
+                usecols=usecols,
+                dtype={"Symbol": str},
+                keep_default_na=False,
+                na_values=[""],
+            )
+            metadata_list.append(metadata.rename(columns=self.metadata_columns))
+
+        metadata = pd.concat(metadata_list, ignore_index=True, sort=False)
+        metadata = metadata.reindex(
+            columns=["symbol", "name", "market_cap", "volume", "sector", "tier"]
+        )
+        metadata = metadata.drop_duplicates("symbol").set_index("symbol")
+        metadata["market_cap"] = pd.to_numeric(metadata["market_cap"], errors="coerce")
+        metadata["volume"] = pd.to_numeric(metadata["volume"], errors="coerce")
+
+        return metadata
+
+    def read_word_list(self, word_list_path: str) -> set:
+        """Read word list file with one word per line
+
+        Args:
+            word_list_path (str): path of word list file
+
+        Returns:
+            set: set of lowercase words
+        """
+        with open(word_list_path) as word_file:
+            word_set = {line.strip().lower() for line in word_file if line.strip()}
+
+        return word_set
 
     def read_ticker_file(self, csv_path_list: list, ticker_column_name: str) -> list:
         """Read .csv file with path specified.
@@ -42,51 +236,43 @@ class TickerData:
         Returns:
             list: list of ticker symbols
         """
-        ticker_list = []
+        ticker_set = set()
         for csv_path in csv_path_list:
-            ticker_data = pd.read_csv(csv_path)
-            ticker_list = ticker_list + list(ticker_data[ticker_column_name])
+            # Only parse the ticker column, symbols such as NA are kept as str
+            ticker_data = pd.read_csv(
+                csv_path, usecols=[ticker_column_name], dtype=str, na_filter=False
+            )
+            ticker_set.update(ticker_data[ticker_column_name])
 
-        # remove duplicates
-        ticker_list = list(set(ticker_list))
+        ticker_list = list(ticker_set)
 
         return ticker_list
 
-    def remove_exceptions(self, ticker_list: list, exception_list: list) -> list:
+    def remove_exceptions(
+        self, ticker_list: list, exception_list: list, min_length: int = 2
+    ) -> list:
         """Remove tickers in excception list
 
         Args:
             ticker_list (list): initial list of ticker symbols
             exception_list (list): list of ticker symbols to remove
+            min_length (int): minimum length of tickers kept
 
         Returns:
             list: list of ticker symbols without tickers in exception_list
         """
 
         # 1. Remove tickers in exception list
-        ticker_list = [ticker for ticker in ticker_list if ticker not in exception_list]
+        exception_set = set(exception_list)
+        ticker_list = [ticker for ticker in ticker_list if ticker not in exception_set]
 
-        # 2. Remove single character tickers
-        ticker_list = [ticker for ticker in ticker_list if len(ticker) != 1]
+        # 2. Remove empty and, by default, single character tickers
+        ticker_list = [
+            ticker for ticker in ticker_list if len(ticker) >= max(min_length, 1)
+        ]
 
         return ticker_list
 
-    def create_variation(self, ticker_list: list) -> list:
-        """Create variations of tickers as it could appear differently
-        in reddit text
-
-        Args:
-            ticker_list (list): list of ticker symbols
-
-        Returns:
-            list: list of ticker symbols with variation added
-        """
-        # Add dollar sign
-        dollar_ticker_list = ["$" + ticker for ticker in ticker_list]
-        full_ticker_list = ticker_list + dollar_ticker_list
-
-        return full_ticker_list
-
 
 if __name__ == "__main__":
     print("ticker_data")
@@ -95,7 +281,8 @@ if __name__ == "__main__":
     otc_path = "data/otc_screener.csv"
     csv_path_list = [nasdaq_path, otc_path]
     exception_list = ["TD", "ANY", "CEO", "EV"]
+    word_list_path = "data/english_words.txt"
 
-    ticker_data = TickerData(csv_path_list, exception_list)
-    ticker_list = ticker_data.create_data()
-    print(len(ticker_list))
\ No newline at end of file
+    ticker_data = TickerData(csv_path_list, exception_list, None, word_list_path)
+    ticker_index = ticker_data.create_data()
+    print(len(ticker_index), len(ticker_index.dollar_only))
\ No newline at end of file
@@ -0,0 +1,74 @@
+class TickerIndex:
+    """Immutable index of ticker symbols used to find tickers in reddit text.
+    The $ variant of every symbol is normalized to the bare symbol when the
+    index is built, so matching returns symbols without $ sign. Ambiguous
+    symbols can be restricted to their $ variant
+
+    Args:
+        ticker_list (list): list of ticker symbols without $ sign
+        dollar_only_list (list): list of ticker symbols only matched with
+                                $ sign, e.g. symbols which are English words
+        metadata (pd.DataFrame): per-ticker metadata indexed by symbol, as
+                                built by TickerData.create_metadata, None if
+                                not available
+    """
+
+    def __init__(self, ticker_list: list, dollar_only_list: list = (), metadata=None):
+        """Constructor method"""
+        dollar_only = frozenset(dollar_only_list)
+        lookup = {}
+        for ticker in ticker_list:
+            if ticker not in dollar_only:
+                lookup[ticker] = ticker
+            lookup["$" + ticker] = ticker
+
+        self._lookup = lookup
+        self.tickers = frozenset(ticker_list)
+        self.dollar_only = dollar_only & self.tickers
+        self.metadata = metadata
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._lookup
+
+    def get_metadata(self, ticker: str) -> dict:
+        """Return metadata of ticker, e.g. name, liquidity_tier and
+        requires_dollar
+
+        Args:
+            ticker (str): ticker symbol without $ sign
+
+        Returns:
+            dict: metadata of ticker, None if not available
+        """
+        if self.metadata is None or ticker not in self.metadata.index:
+            return None
+
+        return self.metadata.loc[ticker].to_dict()
+
+    def match(self, text: str) -> list:
+        """Find ticker symbols in text. Text is tokenized on any whitespace
+
+        Args:
+            text (str): string to extract ticker symbols
+
+        Returns:
+            list: list of ticker symbols found, one per distinct matching token
+        """
+        lookup = self._lookup
+        return [lookup[token] for token in lookup.keys() & text.split()]
+
+    def match_many(self, texts) -> list:
+        """Find ticker symbols in every text of an iterable, e.g. a column
+
+        Args:
+            texts (iterable): iterable of strings to extract ticker symbols
+
+        Returns:
+            list: list containing a list of ticker symbols for each text
+        """
+        lookup = self._lookup
+        keys = lookup.keys()
+        return [[lookup[token] for token in keys & text.split()] for text in texts]
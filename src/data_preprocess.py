@@ -1,6 +1,4 @@
 import pandas as pd
-import yfinance as yf
-import praw
 from datetime import datetime
 
 
@@ -16,7 +14,18 @@ clean_columns = [
     "type",
 ]
 
-reddit = praw.Reddit('DEFAULT') # credentials stored in praw.ini
+reddit = None
+
+
+def get_reddit():
+    """Create Reddit client on first use, credentials stored in praw.ini"""
+    global reddit
+    if reddit is None:
+        import praw
+
+        reddit = praw.Reddit("DEFAULT")
+    return reddit
+
 
 def process_ticker_list(ticker_list, exception_list):
     ticker_list_len_1 = [ticker for ticker in ticker_list if len(ticker) == 1]
@@ -128,7 +137,7 @@ def save_subreddit(subreddit_name, extract_limit):
     reddit_main_data = create_reddit_df()
 
     # Create subreddit instance
-    subreddit = reddit.subreddit(subreddit_name)
+    subreddit = get_reddit().subreddit(subreddit_name)
 
     for submission in subreddit.new(limit=extract_limit):
         submission_df = save_submission(submission)
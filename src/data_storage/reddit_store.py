@@ -0,0 +1,185 @@
+import os
+import time
+import uuid
+from typing import TYPE_CHECKING
+
+import pandas as pd
+
+# pyarrow is slow to import and only needed for type annotations here
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+class RedditStore:
+    """Store of reddit data as zstd compressed parquet files, partitioned by
+    date and subreddit in hive layout (date=YYYY-MM-DD/subreddit=name).
+    Writes append new files, and reads load only the columns and
+    partitions requested
+
+    Args:
+        root_path (str): root directory of the dataset
+    """
+
+    partition_columns = ["date", "subreddit"]
+    key_columns = ["type", "id", "ticker"]
+    # Arrow types of data file columns. Every file is written with all of
+    # them, so a partition whose column is all null, e.g. ticker of a batch
+    # without mentions, is not inferred as null type and still reads back
+    column_types = [
+        ("submission_title", "string"),
+        ("submission_id", "string"),
+        ("author", "string"),
+        ("body", "string"),
+        ("created_utc", "int64"),
+        ("id", "string"),
+        ("score", "int64"),
+        ("type", "string"),
+        ("ticker", "string"),
+        ("sentiment_score", "double"),
+        ("weighted_sentiment_score", "double"),
+        ("scraped_utc", "double"),
+    ]
+
+    def __init__(self, root_path: str):
+        """Constructor method"""
+        self.root_path = root_path
+
+    def create_schema(self, partitioned: bool = False) -> "pa.Schema":
+        """Create arrow schema of data files from column_types
+
+        Args:
+            partitioned (bool): add partition columns, as in the dataset
+
+        Returns:
+            pa.Schema: schema of data files or dataset
+        """
+        import pyarrow as pa
+
+        fields = [(name, pa.type_for_alias(alias)) for name, alias in self.column_types]
+        if partitioned:
+            fields += [(name, pa.string()) for name in self.partition_columns]
+
+        return pa.schema(fields)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append data to the store, one file per date and subreddit. Files
+        have the columns of column_types, optional columns missing from df
+        are written as null and other columns are not written
+
+        Args:
+            df (pd.DataFrame): DataFrame from RedditData.create_data, with
+                            optional score columns
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = self.create_schema()
+        df = df.copy()
+        for name in schema.names:
+            if name not in df and name != "scraped_utc":
+                df[name] = None
+        df["created_utc"] = df["created_utc"].astype("int64")
+
+        # UTC date of each row, formatted once per distinct day
+        day = df["created_utc"] // 86400
+        unique_days = day.unique()
+        day_str = pd.to_datetime(unique_days * 86400, unit="s").strftime("%Y-%m-%d")
+        df["date"] = day.map(dict(zip(unique_days, day_str)))
+
+        # Rows written later replace earlier rows with the same key on read
+        df["scraped_utc"] = time.time()
+
+        file_name = "part-{}.parquet".format(uuid.uuid4().hex)
+        for (date, subreddit), partition_df in df.groupby(self.partition_columns):
+            partition_path = os.path.join(
+                self.root_path, "date=" + date, "subreddit=" + subreddit
+            )
+            os.makedirs(partition_path, exist_ok=True)
+
+            table = pa.Table.from_pandas(
+                partition_df[schema.names], schema=schema, preserve_index=False
+            )
+            pq.write_table(
+                table, os.path.join(partition_path, file_name), compression="zstd"
+            )
+
+    def read(
+        self,
+        columns: list = None,
+        start: pd.Timestamp = None,
+        end: pd.Timestamp = None,
+        subreddits: list = None,
+        drop_duplicates: bool = True,
+    ) -> pd.DataFrame:
+        """Read data from the store. Partitions outside of the time range and
+        subreddits are skipped, and only the columns requested are read
+
+        Args:
+            columns (list): columns to read, None to read all columns
+            start (pd.Timestamp): read rows created at or after start, naive
+                                timestamps are taken as UTC
+            end (pd.Timestamp): read rows created before end, naive
+                                timestamps are taken as UTC
+            subreddits (list): subreddits to read, None to read all subreddits
+            drop_duplicates (bool): keep only the latest written row of rows
+                                    with the same type, id and ticker
+
+        Returns:
+            pd.DataFrame: DataFrame of rows read
+        """
+        if not os.path.exists(self.root_path):
+            return pd.DataFrame(columns=columns)
+
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        partitioning = ds.partitioning(
+            pa.schema([("date", pa.string()), ("subreddit", pa.string())]),
+            flavor="hive",
+        )
+        dataset = ds.dataset(
+            self.root_path,
+            format="parquet",
+            schema=self.create_schema(partitioned=True),
+            partitioning=partitioning,
+        )
+
+        # Partition filters prune files, created_utc filters use row group stats
+        expression = None
+        conditions = []
+        if start is not None:
+            start = self.to_utc(start)
+            conditions.append(ds.field("date") >= start.strftime("%Y-%m-%d"))
+            conditions.append(ds.field("created_utc") >= int(start.timestamp()))
+        if end is not None:
+            end = self.to_utc(end)
+            conditions.append(ds.field("date") <= end.strftime("%Y-%m-%d"))
+            conditions.append(ds.field("created_utc") < int(end.timestamp()))
+        if subreddits is not None:
+            conditions.append(ds.field("subreddit").isin(subreddits))
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        read_columns = columns
+        if columns is not None and drop_duplicates:
+            extra_columns = self.key_columns + ["scraped_utc"]
+            read_columns = columns + [c for c in extra_columns if c not in columns]
+
+        df = dataset.to_table(columns=read_columns, filter=expression).to_pandas()
+
+        if drop_duplicates:
+            df = df.sort_values("scraped_utc", kind="mergesort")
+            df = df.drop_duplicates(self.key_columns, keep="last")
+            df = df.sort_index().reset_index(drop=True)
+        if columns is not None:
+            df = df[columns]
+
+        return df
+
+    def to_utc(self, timestamp: pd.Timestamp) -> pd.Timestamp:
+        """Convert timestamp to UTC, naive timestamps are taken as UTC"""
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            return timestamp.tz_localize("UTC")
+
+        return timestamp.tz_convert("UTC")
@@ -0,0 +1,22 @@
+import sqlite3
+
+# SQLite limits the number of host parameters in a single statement
+MAX_QUERY_PARAMS = 900
+
+
+def select_in_chunks(connection: sqlite3.Connection, query: str, keys: list):
+    """Run a query matching a column against keys, in chunks of at most
+    MAX_QUERY_PARAMS keys
+
+    Args:
+        connection (sqlite3.Connection): connection to database
+        query (str): query with a {} placeholder for the list of host
+                    parameters, e.g. "SELECT id FROM comment WHERE id IN ({})"
+        keys (list): list of key values
+
+    Yields:
+        tuple: rows returned by the query
+    """
+    for i in range(0, len(keys), MAX_QUERY_PARAMS):
+        chunk = keys[i : i + MAX_QUERY_PARAMS]
+        yield from connection.execute(query.format(",".join("?" * len(chunk))), chunk)
@@ -0,0 +1,167 @@
+import fcntl
+import os
+import tempfile
+
+import numpy as np
+import torch
+
+
+class PytorchBackend:
+    """Eager PyTorch backend returning logits of a batch
+
+    Args:
+        model (transformers.PreTrainedModel): sequence classification model
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.model.eval()
+
+    def __call__(self, batch: dict) -> np.ndarray:
+        with torch.no_grad():
+            output = self.model(**batch)
+
+        return output.logits.numpy()
+
+
+class QuantizedBackend(PytorchBackend):
+    """PyTorch backend with linear layers dynamically quantized to int8
+
+    Args:
+        model (transformers.PreTrainedModel): sequence classification model
+    """
+
+    def __init__(self, model):
+        model.eval()
+        quantized_model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized_model)
+
+
+class LogitsModule(torch.nn.Module):
+    """Wrap model so that it takes positional tensors and returns logits,
+    as needed to export it to ONNX"""
+
+    def __init__(self, model, input_names: list):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).logits
+
+
+def load_model(model_name: str):
+    """Load eager sequence classification model from huggingface
+
+    Args:
+        model_name (str): model name, a valid model from huggingface
+
+    Returns:
+        transformers.PreTrainedModel: sequence classification model
+    """
+    from transformers import AutoModelForSequenceClassification
+
+    return AutoModelForSequenceClassification.from_pretrained(model_name)
+
+
+class OnnxBackend:
+    """Backend running the model exported as an ONNX graph with ONNX Runtime.
+    The model is loaded and exported to onnx_path only if the file does not
+    exist. Processes exporting at once wait on a lock file, and the graph is
+    written to a temporary file moved into place once complete, so that an
+    interrupted export never leaves a truncated graph at onnx_path
+
+    Args:
+        model_name (str): model name, a valid model from huggingface
+        tokenizer (transformers.PreTrainedTokenizer): tokenizer of model
+        onnx_path (str): path of exported ONNX graph
+    """
+
+    def __init__(self, model_name: str, tokenizer, onnx_path: str):
+        # optional dependency, only needed by this backend
+        import onnxruntime
+
+        if not os.path.exists(onnx_path):
+            directory = os.path.dirname(onnx_path) or "."
+            os.makedirs(directory, exist_ok=True)
+            with open(onnx_path + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                # Another process may have exported while this one waited
+                if not os.path.exists(onnx_path):
+                    self.export(load_model(model_name), tokenizer, onnx_path)
+
+        self.session = onnxruntime.InferenceSession(
+            onnx_path, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def export(self, model, tokenizer, onnx_path: str) -> None:
+        """Export model to ONNX with dynamic batch and sequence axes
+
+        Args:
+            model (transformers.PreTrainedModel): sequence classification model
+            tokenizer (transformers.PreTrainedTokenizer): tokenizer of model
+            onnx_path (str): path of exported ONNX graph
+        """
+        model.eval()
+        file, temp_path = tempfile.mkstemp(
+            suffix=".onnx", dir=os.path.dirname(onnx_path) or "."
+        )
+        os.close(file)
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    LogitsModule(model, input_names),
+                    tuple(sample[name] for name in input_names),
+                    temp_path,
+                    input_names=input_names,
+                    output_names=["logits"],
+                    dynamic_axes=dynamic_axes,
+                    opset_version=12,
+                )
+            os.replace(temp_path, onnx_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def __call__(self, batch: dict) -> np.ndarray:
+        inputs = {
+            name: tensor.numpy()
+            for name, tensor in batch.items()
+            if name in self.input_names
+        }
+
+        return self.session.run(["logits"], inputs)[0]
+
+
+def create_backend(backend: str, model_name: str, tokenizer, onnx_path: str):
+    """Create backend used by Model to compute logits. The eager model is
+    only loaded if the backend needs it
+
+    Args:
+        backend (str): one of "pytorch", "quantized" or "onnx"
+        model_name (str): model name, a valid model from huggingface
+        tokenizer (transformers.PreTrainedTokenizer): tokenizer of model
+        onnx_path (str): path of exported ONNX graph, used by "onnx" backend
+
+    Returns:
+        callable: backend taking a dict of padded token tensors and
+                returning logits
+    """
+    if backend == "pytorch":
+        return PytorchBackend(load_model(model_name))
+    if backend == "quantized":
+        return QuantizedBackend(load_model(model_name))
+    if backend == "onnx":
+        return OnnxBackend(model_name, tokenizer, onnx_path)
+
+    raise ValueError(
+        "backend must be one of 'pytorch', 'quantized' or 'onnx', got " + repr(backend)
+    )
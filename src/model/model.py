@@ -1,17 +1,28 @@
-from typing import Tuple
+from typing import TYPE_CHECKING, Tuple
+import os
 import random
 
 import numpy as np
-import pandas as pd
-import torch
-from torch.utils.data import DataLoader
-from transformers import AutoModel, AutoTokenizer, AutoModelForSequenceClassification
 
+from .prediction_cache import PredictionCache, create_cache_key
+from .token_cache import TokenCache
 
-# Set seed
-torch.manual_seed(0)
-random.seed(0)
-np.random.seed(0)
+# torch is slow to import and only needed for type annotations here
+if TYPE_CHECKING:
+    import torch
+
+# Texts tokenized per call of the tokenizer, bounding memory of token lists
+TOKENIZE_CHUNK_SIZE = 4096
+
+
+def set_seed(seed: int = 0) -> None:
+    """Set seed of random generators, including torch's. Called once by entry
+    points, as it resets the global random state"""
+    import torch
+
+    torch.manual_seed(seed)
+    random.seed(seed)
+    np.random.seed(seed)
 
 
 class Model:
@@ -20,15 +31,53 @@ class Model:
     Args:
         model_name (str): model name, a valid model from huggingface
         batch_size (int): batch size for prediction
+        cache (PredictionCache): cache of predictions from previous calls,
+                                None to disable caching
+        backend (str): backend computing logits, one of "pytorch" (eager),
+                    "quantized" (dynamic int8 PyTorch) or "onnx" (ONNX Runtime)
+        onnx_path (str): path of exported ONNX graph used by "onnx" backend,
+                    defaults to a file named after the model in data/
+        token_cache (TokenCache): cache of token ids from previous calls,
+                                None to disable caching
     """
 
-    def __init__(self, model_name: str, batch_size: int):
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int,
+        cache: PredictionCache = None,
+        backend: str = "pytorch",
+        onnx_path: str = None,
+        token_cache: TokenCache = None,
+    ):
+        # torch and transformers are slow to import, so load them on first use
+        from transformers import AutoTokenizer
+        from .backend import create_backend
+
+        if onnx_path is None:
+            onnx_path = os.path.join("data", model_name.replace("/", "--") + ".onnx")
+
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.backend = create_backend(backend, model_name, self.tokenizer, onnx_path)
+        self.model_name = model_name
         self.batch_size = batch_size
+        self.cache = cache
+        self.token_cache = token_cache
+
+        # Token ids depend on truncation length as well as on the tokenizer
+        self.tokenizer_name = "{}:{}".format(
+            model_name, self.tokenizer.model_max_length
+        )
+
+        # Backends may disagree slightly, so they do not share cached predictions
+        self.cache_name = model_name
+        if backend != "pytorch":
+            self.cache_name = model_name + ":" + backend
 
     def predict(self, text: list) -> list:
-        """Predict sentiment using hugging face model from a list of text
+        """Predict sentiment using hugging face model from a list of text.
+        Duplicate texts are scored once, and texts found in cache are not
+        scored again
 
         Args:
             text (list): list of texts to perform sentiment analysis
@@ -36,91 +85,194 @@ class Model:
         Returns:
             list: list of sentiment, 1=positive 0=negative
         """
+        keys = [create_cache_key(self.cache_name, string) for string in text]
+        preds_by_key = self.cache.get_many(keys) if self.cache is not None else {}
+
+        # Unique texts not found in cache
+        missing_text = {}
+        for key, string in zip(keys, text):
+            if key not in preds_by_key and key not in missing_text:
+                missing_text[key] = string
 
-        encoded_input = self.__encode_token(text)
-        dataloaders = self.__create_dataloaders(encoded_input, self.batch_size)
+        if missing_text:
+            missing_preds = self.__predict_text(list(missing_text.values()))
+            missing_preds = dict(zip(missing_text.keys(), missing_preds))
+            preds_by_key.update(missing_preds)
+            if self.cache is not None:
+                self.cache.set_many(missing_preds)
 
-        preds = []
-        for i, batch in enumerate(zip(dataloaders[0], dataloaders[1], dataloaders[2])):
-            preds_batch_list = self.__predict_batch(self.model, batch)
-            preds += preds_batch_list
+        preds = [preds_by_key[key] for key in keys]
 
         return preds
 
-    def __encode_token(self, text: list) -> dict:
-        """Encode list of texts into tokens, which is input needed for
-        huggingface model
+    def __predict_text(self, text: list) -> list:
+        """Predict sentiment of a list of text with the model. Texts are
+        sorted by token length so that each batch is padded only to its own
+        longest text, and predictions are returned in input order
+
+        Args:
+            text (list): list of texts to perform sentiment analysis
+
+        Returns:
+            list: list of sentiment, 1=positive 0=negative
+        """
+
+        token_ids = self.encode(text)
+        features, order = self.__sort_by_length(token_ids)
+        dataloader = self.__create_dataloader(features, self.batch_size)
+
+        sorted_preds = []
+        for batch in dataloader:
+            preds_batch_list = self.__predict_batch(batch)
+            sorted_preds += preds_batch_list
+
+        # Restore input order
+        preds = [None] * len(sorted_preds)
+        for sorted_position, input_position in enumerate(order):
+            preds[input_position] = sorted_preds[sorted_position]
+
+        return preds
+
+    def encode(self, text: list) -> list:
+        """Encode list of texts into token ids, which is input needed for
+        huggingface model. Token ids found in token_cache are read from it,
+        the others are tokenized and added to it. Padding is left to each batch
 
         Args:
             text (list): list of texts to encode
 
         Returns:
-            dict: dict of encoded tokens
+            list: list of np.ndarray of token ids, one per text
         """
-        encoded_input = self.tokenizer(
-            [str(string) for string in text],
-            truncation=True,
-            padding=True,
-            return_tensors="pt",
-        )
+        if self.token_cache is None:
+            return self.__tokenize(text)
+
+        keys = [create_cache_key(self.tokenizer_name, string) for string in text]
+        token_ids = self.token_cache.get_many(keys)
 
-        return encoded_input
+        missing_text = {}
+        for key, string in zip(keys, text):
+            if key not in token_ids and key not in missing_text:
+                missing_text[key] = string
 
-    def __create_dataloaders(
-        self, encoded_input: dict, batch_size
-    ) -> Tuple[DataLoader, DataLoader, DataLoader]:
-        """Create dataloaders for making batch prediction
+        if missing_text:
+            missing_ids = self.__tokenize(list(missing_text.values()))
+            missing_ids = dict(zip(missing_text.keys(), missing_ids))
+            self.token_cache.set_many(missing_ids)
+            token_ids.update(missing_ids)
+
+        return [token_ids[key] for key in keys]
+
+    def __tokenize(self, text: list) -> list:
+        """Tokenize texts in chunks. The fast tokenizer loaded by AutoTokenizer
+        encodes each chunk in parallel on its own rayon thread pool, sized by
+        RAYON_NUM_THREADS and disabled by TOKENIZERS_PARALLELISM=false
 
         Args:
-            encoded_input (dict): dict of encoded tokens
-            batch_size ([type]): batch size of dataloader
+            text (list): list of texts to tokenize
 
         Returns:
-            Tuple[DataLoader, DataLoader, DataLoader]: Dataloader of each token
+            list: list of np.ndarray of int32 token ids, one per text
         """
-        input_ids = encoded_input["input_ids"]
-        token_type_ids = encoded_input["token_type_ids"]
-        attention_mask = encoded_input["attention_mask"]
+        token_ids = []
+        for i in range(0, len(text), TOKENIZE_CHUNK_SIZE):
+            # Only non str values such as NaN need converting
+            chunk = [
+                string if isinstance(string, str) else str(string)
+                for string in text[i : i + TOKENIZE_CHUNK_SIZE]
+            ]
+            encoded_input = self.tokenizer(
+                chunk,
+                truncation=True,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            token_ids += [
+                np.array(input_ids, dtype=np.int32)
+                for input_ids in encoded_input["input_ids"]
+            ]
 
-        input_ids_data_loader = torch.utils.data.DataLoader(
-            input_ids, batch_size=batch_size, shuffle=False
-        )
-        token_type_ids_data_loader = torch.utils.data.DataLoader(
-            token_type_ids, batch_size=batch_size, shuffle=False
-        )
-        attention_mask_data_loader = torch.utils.data.DataLoader(
-            attention_mask, batch_size=batch_size, shuffle=False
-        )
+        return token_ids
 
-        return (
-            input_ids_data_loader,
-            token_type_ids_data_loader,
-            attention_mask_data_loader,
-        )
+    def __sort_by_length(self, token_ids: list) -> Tuple[list, list]:
+        """Sort token ids of texts by length
+
+        Args:
+            token_ids (list): list of token ids, one per text
+
+        Returns:
+            Tuple[list, list]: list of token ids sorted by length, and input
+                            position of each sorted token ids
+        """
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+        features = [token_ids[i] for i in order]
+
+        return features, order
 
-    def __predict_batch(self, model: AutoModel, batch: Tuple):
-        """Make a batch inference using huggingface model
+    def __create_dataloader(
+        self, features: list, batch_size: int
+    ) -> "torch.utils.data.DataLoader":
+        """Create dataloader for making batch prediction. Each batch is padded
+        to the longest text within the batch
 
         Args:
-            model (transformers.PreTrainedModel): model for making prediction
-            batch (Tuple): tuple of dataloaders
+            features (list): list of feature dicts of encoded tokens
+            batch_size (int): batch size of dataloader
 
         Returns:
-            [type]: list of sentiment
+            DataLoader: Dataloader yielding dicts of padded token tensors
         """
-        input_ids_batch = batch[0]
-        token_type_ids_batch = batch[1]
-        attention_mask_batch = batch[2]
-
-        output = model(
-            input_ids=input_ids_batch,
-            token_type_ids=token_type_ids_batch,
-            attention_mask=attention_mask_batch,
+        from torch.utils.data import DataLoader
+
+        dataloader = DataLoader(
+            features, batch_size=batch_size, shuffle=False, collate_fn=self.__collate
         )
 
-        logits = output.logits
-        preds_batch = np.argmax(torch.softmax(logits, dim=1).detach().numpy(), axis=1)
-        preds_batch_list = list(preds_batch)
+        return dataloader
+
+    def __collate(self, features: list) -> dict:
+        """Pad a batch of token ids into tensors of input_ids, attention_mask
+        and, if used by the model, token_type_ids"""
+        import torch
+
+        # Padding is masked out, so tokenizers without a pad token pad with eos or 0
+        pad_token_id = self.tokenizer.pad_token_id
+        if pad_token_id is None:
+            pad_token_id = self.tokenizer.eos_token_id or 0
+
+        max_length = max(len(input_ids) for input_ids in features)
+        input_ids = np.full((len(features), max_length), pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(features), max_length), dtype=np.int64)
+        for i, ids in enumerate(features):
+            if self.tokenizer.padding_side == "left":
+                input_ids[i, max_length - len(ids) :] = ids
+                attention_mask[i, max_length - len(ids) :] = 1
+            else:
+                input_ids[i, : len(ids)] = ids
+                attention_mask[i, : len(ids)] = 1
+
+        batch = {
+            "input_ids": torch.from_numpy(input_ids),
+            "attention_mask": torch.from_numpy(attention_mask),
+        }
+        # Single texts are a single segment
+        if "token_type_ids" in self.tokenizer.model_input_names:
+            batch["token_type_ids"] = torch.zeros_like(batch["input_ids"])
+
+        return batch
+
+    def __predict_batch(self, batch: dict) -> list:
+        """Make a batch inference using the model backend
+
+        Args:
+            batch (dict): dict of padded token tensors
+
+        Returns:
+            list: list of sentiment
+        """
+        logits = self.backend(batch)
+        preds_batch = np.argmax(logits, axis=1)
+        preds_batch_list = preds_batch.tolist()
 
         return preds_batch_list
 
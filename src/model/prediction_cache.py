@@ -0,0 +1,127 @@
+import hashlib
+import sqlite3
+from collections import OrderedDict
+
+from data_storage.sqlite_query import select_in_chunks
+
+
+def create_cache_key(model_name: str, text: str) -> str:
+    """Create cache key from model name and hash of text with whitespace
+    normalized
+
+    Args:
+        model_name (str): name of model making the prediction
+        text (str): text to predict
+
+    Returns:
+        str: cache key
+    """
+    normalized_text = " ".join(str(text).split())
+    key_str = model_name + "\0" + normalized_text
+
+    return hashlib.sha1(key_str.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """Cache of predictions keyed by create_cache_key. Keeps an in-memory
+    LRU tier and an optional on-disk sqlite tier which survives restarts
+
+    Args:
+        max_size (int): maximum number of predictions kept in memory
+        db_path (str): path of sqlite database file for on-disk tier,
+                    None to keep predictions in memory only
+    """
+
+    def __init__(self, max_size: int = 100000, db_path: str = None):
+        """Constructor method"""
+        self.max_size = max_size
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = None
+        if db_path is not None:
+            self.connection = sqlite3.connect(db_path)
+            with self.connection:
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS prediction "
+                    "(key TEXT PRIMARY KEY, value)"
+                )
+
+    def get_many(self, keys: list) -> dict:
+        """Look up predictions of keys in memory, then on disk
+
+        Args:
+            keys (list): list of cache keys
+
+        Returns:
+            dict: mapping of cache key to prediction for keys found
+        """
+        found = {}
+        missing_keys = []
+        for key in keys:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                found[key] = self.memory[key]
+            else:
+                missing_keys.append(key)
+
+        if self.connection is not None and missing_keys:
+            disk_found = self.__get_from_disk(list(set(missing_keys)))
+            self.__set_in_memory(disk_found)
+            found.update(disk_found)
+
+        num_hits = sum(key in found for key in keys)
+        self.hits += num_hits
+        self.misses += len(keys) - num_hits
+
+        return found
+
+    def set_many(self, predictions: dict) -> None:
+        """Save predictions in memory and on disk
+
+        Args:
+            predictions (dict): mapping of cache key to prediction
+        """
+        self.__set_in_memory(predictions)
+
+        if self.connection is not None:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO prediction (key, value) VALUES (?, ?)",
+                    list(predictions.items()),
+                )
+
+    def stats(self) -> dict:
+        """Return hit and miss counters of cache lookups
+
+        Returns:
+            dict: dict of hits, misses, hit_rate and number of predictions
+                in memory
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }
+
+    def __set_in_memory(self, predictions: dict) -> None:
+        """Save predictions in memory, evicting least recently used ones"""
+        for key, value in predictions.items():
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+
+        while len(self.memory) > self.max_size:
+            self.memory.popitem(last=False)
+
+    def __get_from_disk(self, keys: list) -> dict:
+        """Look up predictions of keys in sqlite database"""
+        return dict(
+            select_in_chunks(
+                self.connection,
+                "SELECT key, value FROM prediction WHERE key IN ({})",
+                keys,
+            )
+        )
@@ -0,0 +1,256 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+
+class ScoringRequest:
+    """Texts of a single caller and the future of their predictions"""
+
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.future = Future()
+
+
+class MicroBatcher:
+    """Merge concurrent predict calls into micro-batches scored by a single
+    model thread. A batch is scored once it holds max_batch_size texts or
+    max_wait_ms after its first request arrived, whichever is sooner, so
+    requests queued while the model is busy form the next batch at once.
+    Requests are never split, a request larger than max_batch_size is
+    scored as a batch of its own
+
+    Args:
+        model (Model): model used to predict sentiment, only called from the
+                    batching thread
+        max_batch_size (int): maximum number of texts per batch
+        max_wait_ms (float): maximum milliseconds a request waits for other
+                    requests to join its batch
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 10.0):
+        """Constructor method"""
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.num_requests = 0
+        self.num_texts = 0
+        self.num_batches = 0
+        self.batch_size_histogram = {}
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, texts: list) -> Future:
+        """Queue texts for prediction
+
+        Args:
+            texts (list): list of texts to perform sentiment analysis
+
+        Returns:
+            Future: future of list of sentiment, 1=positive 0=negative
+        """
+        request = ScoringRequest(list(texts))
+        self.requests.put(request)
+
+        return request.future
+
+    def predict(self, texts: list) -> list:
+        """Predict sentiment of texts, batched with concurrent calls
+
+        Args:
+            texts (list): list of texts to perform sentiment analysis
+
+        Returns:
+            list: list of sentiment, 1=positive 0=negative
+        """
+        return self.submit(texts).result()
+
+    def run(self) -> None:
+        """Collect and score batches until a None request is queued"""
+        # Request taken from the queue that did not fit into the last batch
+        carried = []
+        while True:
+            request = carried.pop() if carried else self.requests.get()
+            if request is None:
+                return
+
+            batch = [request]
+            batch_size = len(request.texts)
+            deadline = time.monotonic() + self.max_wait
+            while batch_size < self.max_batch_size:
+                # Requests already queued join even once the wait is over
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        request = self.requests.get(timeout=timeout)
+                    else:
+                        request = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+                # Requests that do not fit start the next batch
+                if request is None or batch_size + len(request.texts) > (
+                    self.max_batch_size
+                ):
+                    carried.append(request)
+                    break
+                batch.append(request)
+                batch_size += len(request.texts)
+
+            self.score_batch(batch, batch_size)
+
+    def score_batch(self, batch: list, batch_size: int) -> None:
+        """Score texts of a batch of requests and resolve their futures"""
+        texts = [text for request in batch for text in request.texts]
+        try:
+            preds = self.model.predict(texts)
+        except Exception as error:
+            for request in batch:
+                request.future.set_exception(error)
+        else:
+            position = 0
+            for request in batch:
+                num_texts = len(request.texts)
+                request.future.set_result(preds[position : position + num_texts])
+                position += num_texts
+
+        self.num_requests += len(batch)
+        self.num_texts += batch_size
+        self.num_batches += 1
+        self.batch_size_histogram[batch_size] = (
+            self.batch_size_histogram.get(batch_size, 0) + 1
+        )
+
+    def stats(self) -> dict:
+        """Return queue depth and batching counters
+
+        Returns:
+            dict: dict of queue_depth (requests waiting), requests, texts,
+                batches, mean_batch_size and batch_size_histogram mapping
+                number of texts in a batch to number of batches
+        """
+        histogram = dict(self.batch_size_histogram)
+        return {
+            "queue_depth": self.requests.qsize(),
+            "requests": self.num_requests,
+            "texts": self.num_texts,
+            "batches": self.num_batches,
+            "mean_batch_size": (
+                self.num_texts / self.num_batches if self.num_batches else 0.0
+            ),
+            "batch_size_histogram": {
+                str(size): histogram[size] for size in sorted(histogram)
+            },
+        }
+
+    def close(self) -> None:
+        """Score queued requests and stop the batching thread"""
+        self.requests.put(None)
+        self.thread.join()
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler of the scoring service
+
+    - POST /predict with body {"texts": [...]} returns {"predictions": [...]}
+    - GET /stats returns MicroBatcher.stats
+    """
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            texts = json.loads(self.rfile.read(length))["texts"]
+            if not isinstance(texts, list):
+                raise ValueError("texts must be a list")
+        except (ValueError, KeyError, TypeError) as error:
+            self.send_json(400, {"error": str(error)})
+            return
+
+        try:
+            preds = self.server.batcher.predict(texts)
+        except Exception as error:
+            self.send_json(500, {"error": str(error)})
+            return
+
+        self.send_json(200, {"predictions": preds})
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        self.send_json(200, self.server.batcher.stats())
+
+    def send_json(self, status: int, body: dict) -> None:
+        """Send body as JSON response"""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Access logs of every request would dominate load tests
+        pass
+
+
+class ScoringServer(ThreadingMixIn, HTTPServer):
+    """HTTP server handling each connection on its own thread, so that
+    concurrent requests can join the same micro-batch
+
+    Args:
+        address (tuple): host and port to listen on, port 0 picks a free port
+        batcher (MicroBatcher): batcher scoring requests
+    """
+
+    daemon_threads = True
+    # Concurrent clients connect at once, the default backlog of 5 resets them
+    request_queue_size = 128
+
+    def __init__(self, address: tuple, batcher: MicroBatcher):
+        """Constructor method"""
+        super().__init__(address, ScoringRequestHandler)
+        self.batcher = batcher
+
+
+if __name__ == "__main__":
+    # Run from repo root: PYTHONPATH=src python -m model.scoring_service
+    parser = argparse.ArgumentParser(description="Serve Model over local HTTP")
+    parser.add_argument("--model-name", default="albert-base-v2")
+    parser.add_argument("--backend", default="pytorch")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--cache-size", type=int, default=100000)
+    args = parser.parse_args()
+
+    from .model import Model
+    from .prediction_cache import PredictionCache
+
+    # In-memory cache only, sqlite connections are bound to their thread
+    model = Model(
+        args.model_name,
+        args.max_batch_size,
+        cache=PredictionCache(args.cache_size),
+        backend=args.backend,
+    )
+    batcher = MicroBatcher(model, args.max_batch_size, args.max_wait_ms)
+    server = ScoringServer((args.host, args.port), batcher)
+    print("serving on http://{}:{}".format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
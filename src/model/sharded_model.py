@@ -0,0 +1,88 @@
+import multiprocessing
+
+from .model import Model, set_seed
+
+
+# Model replica of a worker process, loaded once by init_worker
+worker_model = None
+
+
+def init_worker(
+    model_name: str, batch_size: int, num_threads: int, backend: str
+) -> None:
+    """Load model replica and limit intra-op threads of a worker process"""
+    import torch
+
+    global worker_model
+    torch.set_num_threads(num_threads)
+    set_seed()
+    worker_model = Model(model_name, batch_size, backend=backend)
+
+
+def predict_shard(text: list) -> list:
+    """Predict sentiment of a shard of text with the worker's model replica"""
+    return worker_model.predict(text)
+
+
+class ShardedModel:
+    """Model split across a pool of worker processes, each holding a replica
+    of the model. Has the same predict interface as Model
+
+    Args:
+        model_name (str): model name, a valid model from huggingface
+        batch_size (int): batch size for prediction within each worker
+        num_workers (int): number of worker processes
+        num_threads (int): number of intra-op threads of each worker
+        shard_size (int): number of texts sent to a worker at a time
+        backend (str): backend of each model replica, see Model
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int,
+        num_workers: int,
+        num_threads: int = 1,
+        shard_size: int = 256,
+        backend: str = "pytorch",
+    ):
+        self.shard_size = shard_size
+
+        # spawn avoids forking a parent whose torch thread pool is running
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(
+            num_workers,
+            initializer=init_worker,
+            initargs=(model_name, batch_size, num_threads, backend),
+        )
+
+    def predict(self, text: list) -> list:
+        """Predict sentiment using the worker pool from a list of text
+
+        Args:
+            text (list): list of texts to perform sentiment analysis
+
+        Returns:
+            list: list of sentiment in input order, 1=positive 0=negative
+        """
+        text = list(text)
+        shards = [
+            text[i : i + self.shard_size] for i in range(0, len(text), self.shard_size)
+        ]
+
+        # Pool.map returns results in the order of shards
+        shard_preds = self.pool.map(predict_shard, shards)
+        preds = [pred for preds_list in shard_preds for pred in preds_list]
+
+        return preds
+
+    def close(self) -> None:
+        """Stop worker processes"""
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
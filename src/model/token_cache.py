@@ -0,0 +1,121 @@
+import fcntl
+import os
+import sqlite3
+
+import numpy as np
+
+from data_storage.sqlite_query import select_in_chunks
+
+
+class TokenCache:
+    """On-disk cache of token ids keyed by create_cache_key of tokenizer name
+    and text. Token ids of every text are appended to a flat int32 file,
+    which is memory mapped for reading, so cached token ids are returned as
+    views without copying or decoding. A sqlite index maps each key to the
+    offset and length of its token ids. Appends hold an exclusive lock on the
+    token id file, so processes may share cache_dir
+
+    Args:
+        cache_dir (str): directory of token id file and index
+    """
+
+    def __init__(self, cache_dir: str):
+        """Constructor method"""
+        os.makedirs(cache_dir, exist_ok=True)
+        self.ids_path = os.path.join(cache_dir, "input_ids.bin")
+        self.ids = None
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = sqlite3.connect(os.path.join(cache_dir, "index.db"))
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS token "
+                "(key TEXT PRIMARY KEY, offset INTEGER, length INTEGER)"
+            )
+
+    def get_many(self, keys: list) -> dict:
+        """Look up token ids of keys
+
+        Args:
+            keys (list): list of cache keys
+
+        Returns:
+            dict: mapping of cache key to np.ndarray of int32 token ids, a
+                read-only view of the memory mapped file, for keys found
+        """
+        unique_keys = list(set(keys))
+        rows = select_in_chunks(
+            self.connection,
+            "SELECT key, offset, length FROM token WHERE key IN ({})",
+            unique_keys,
+        )
+        index = {key: (offset, length) for key, offset, length in rows}
+
+        found = {}
+        if index:
+            ids = self.__map_ids()
+            # Other processes may have appended since the file was mapped
+            if max(offset + length for offset, length in index.values()) > len(ids):
+                self.ids = None
+                ids = self.__map_ids()
+            for key, (offset, length) in index.items():
+                found[key] = ids[offset : offset + length]
+
+        num_hits = sum(key in found for key in keys)
+        self.hits += num_hits
+        self.misses += len(keys) - num_hits
+
+        return found
+
+    def set_many(self, token_ids: dict) -> None:
+        """Append token ids to the cache
+
+        Args:
+            token_ids (dict): mapping of cache key to sequence of token ids
+        """
+        if not token_ids:
+            return
+
+        keys = list(token_ids.keys())
+        arrays = [np.asarray(token_ids[key], dtype=np.int32) for key in keys]
+        lengths = [len(array) for array in arrays]
+
+        with open(self.ids_path, "ab") as ids_file:
+            # Other writers may append between reading the size and writing
+            fcntl.flock(ids_file, fcntl.LOCK_EX)
+            # Offsets are counted in token ids, not bytes
+            start = ids_file.seek(0, os.SEEK_END) // 4
+            np.concatenate(arrays).tofile(ids_file)
+            ids_file.flush()
+
+            offsets = np.cumsum([start] + lengths[:-1]).tolist()
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO token (key, offset, length) "
+                    "VALUES (?, ?, ?)",
+                    zip(keys, offsets, lengths),
+                )
+
+        # The file grew, so it is mapped again on the next read
+        self.ids = None
+
+    def stats(self) -> dict:
+        """Return hit and miss counters of cache lookups
+
+        Returns:
+            dict: dict of hits, misses and hit_rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __map_ids(self) -> np.ndarray:
+        """Memory map token id file, once per size of the file"""
+        if self.ids is None:
+            self.ids = np.memmap(self.ids_path, dtype=np.int32, mode="r")
+
+        return self.ids
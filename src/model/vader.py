@@ -1,14 +1,128 @@
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import multiprocessing
+
+from .prediction_cache import PredictionCache, create_cache_key
+
+
+# Bodies of deleted or removed reddit content, scored 0 without running VADER.
+# RedditData.remove_unwanted_char strips the brackets, so cleaned forms as well
+SKIPPED_BODIES = {"", "[deleted]", "[removed]", "deleted", "removed"}
+
+# Analyzer of a worker process, loaded once by init_worker
+worker_vader = None
+
+
+def init_worker() -> None:
+    """Load VADER lexicon of a worker process"""
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    global worker_vader
+    worker_vader = SentimentIntensityAnalyzer()
+
+
+def score_chunk(texts: list) -> list:
+    """Compute compound sentiment score of a chunk of texts in a worker"""
+    return [worker_vader.polarity_scores(text)["compound"] for text in texts]
 
 
 class VaderSentimentAnalyzer:
-    def __init__(self):
+    """Sentiment analyzer using VADER, scoring texts in chunks across a pool
+    of worker processes. The pool is started once, call close to stop it
+
+    Args:
+        cache (PredictionCache): cache of scores from previous calls,
+                                None to disable caching
+        num_workers (int): number of worker processes, 1 scores in process
+        chunk_size (int): number of texts scored by a worker at a time
+    """
+
+    def __init__(
+        self,
+        cache: PredictionCache = None,
+        num_workers: int = 1,
+        chunk_size: int = 5000,
+    ):
+        # nltk is slow to import, so load it on first use
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
         self.vader = SentimentIntensityAnalyzer()
+        self.cache = cache
+        self.num_workers = num_workers
+        self.chunk_size = chunk_size
+        self.pool = None
+        if num_workers > 1:
+            # Workers load their own lexicon, so nothing is inherited from the
+            # parent and the pool is spawned rather than forked
+            context = multiprocessing.get_context("spawn")
+            self.pool = context.Pool(num_workers, initializer=init_worker)
 
     def calculate_sentiment(self, data):
-        data["sentiment_score"] = data["body"].apply(
-            lambda text: self.vader.polarity_scores(text)["compound"]
-        )
+        data["sentiment_score"] = self.score_texts(data["body"])
         data["weighted_sentiment_score"] = data["score"] * data["sentiment_score"]
 
         return data
+
+    def score_texts(self, texts) -> list:
+        """Compute compound sentiment score of texts. Duplicate texts are
+        scored once, and deleted, removed or empty bodies are scored 0
+
+        Args:
+            texts (iterable): iterable of text str, e.g. a column
+
+        Returns:
+            list: list of compound sentiment scores
+        """
+        keys = [create_cache_key("vader", text) for text in texts]
+        scores = self.cache.get_many(keys) if self.cache is not None else {}
+
+        # Unique texts to score
+        missing_text = {}
+        for key, text in zip(keys, texts):
+            if key in scores or key in missing_text:
+                continue
+            if not isinstance(text, str) or text.strip() in SKIPPED_BODIES:
+                scores[key] = 0.0
+            else:
+                missing_text[key] = text
+
+        new_scores = dict(
+            zip(missing_text.keys(), self.score_batch(list(missing_text.values())))
+        )
+        if self.cache is not None:
+            self.cache.set_many(new_scores)
+        scores.update(new_scores)
+
+        return [scores[key] for key in keys]
+
+    def score_batch(self, texts: list) -> list:
+        """Compute compound sentiment score of every text, split into chunks
+        scored by the pool of worker processes
+
+        Args:
+            texts (list): list of text str
+
+        Returns:
+            list: list of compound sentiment scores in input order
+        """
+        if self.pool is None or len(texts) <= self.chunk_size:
+            return [self.vader.polarity_scores(text)["compound"] for text in texts]
+
+        chunks = [
+            texts[i : i + self.chunk_size]
+            for i in range(0, len(texts), self.chunk_size)
+        ]
+        chunk_scores = self.pool.map(score_chunk, chunks)
+
+        return [score for scores in chunk_scores for score in scores]
+
+    def close(self) -> None:
+        """Stop worker processes"""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,424 @@
+import cProfile
+import json
+import os
+import resource
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import partial
+
+import pandas as pd
+
+from data_aggregation.rollup_store import RollupStore
+from data_extraction.archive_data import ArchiveData
+from data_extraction.checkpoint_store import CheckpointStore
+from data_extraction.comment_expansion import CommentExpander, ExpansionBudget
+from data_extraction.reddit_data import RedditData
+from data_extraction.ticker_data import TickerData
+from data_extraction.ticker_index import TickerIndex
+from data_storage.reddit_store import RedditStore
+from model.prediction_cache import PredictionCache
+from model.token_cache import TokenCache
+
+STAGE_NAMES = [
+    "ticker_load",
+    "scrape",
+    "transform",
+    "clean",
+    "extract",
+    "infer",
+    "persist",
+]
+
+
+class StageReport:
+    """Measurements of a pipeline stage, accumulated over every call of the
+    stage. In streaming mode a stage is called once per chunk
+
+    Args:
+        name (str): name of stage
+    """
+
+    def __init__(self, name: str):
+        """Constructor method"""
+        self.name = name
+        self.calls = 0
+        self.wall_time = 0.0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.peak_rss_mb = 0.0
+        self.peak_traced_mb = None
+        self.profile = None
+        self.profile_path = None
+
+    def to_dict(self) -> dict:
+        """Convert report into a JSON serializable dict
+
+        Returns:
+            dict: stage measurements
+        """
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "wall_time_s": round(self.wall_time, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_rss_mb": round(self.peak_rss_mb, 2),
+            "peak_traced_mb": self.peak_traced_mb,
+            "profile_path": self.profile_path,
+        }
+
+
+class Pipeline:
+    """Pipeline running the extraction, inference and storage of reddit data
+    as named stages: ticker_load, scrape, transform, clean, extract, infer and
+    persist. Each stage records wall time, rows in and out, peak memory and
+    optionally a cProfile dump, and a JSON report is written per run
+
+    Peak RSS is the process high-water mark at the end of a stage, so it only
+    grows between stages. If trace_memory is set, the peak of Python
+    allocations made during the stage is traced as well, at a cost in speed.
+    Profile dumps are in pstats format and can be read with pstats or
+    snakeviz. For sampling profiles, run the pipeline under py-spy instead
+
+    Args:
+        config (dict): config with ticker, reddit, model, storage and report
+                    sections, see config.json
+        config_path (str): path of config file, recorded in the report
+    """
+
+    def __init__(self, config: dict, config_path: str = None):
+        """Constructor method"""
+        self.config = config
+        self.config_path = config_path
+        report_config = config.get("report", {})
+        self.report_dir = report_config.get("report_dir")
+        self.profile_dir = report_config.get("profile_dir")
+        self.trace_memory = report_config.get("trace_memory", False)
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.stages = OrderedDict((name, StageReport(name)) for name in STAGE_NAMES)
+
+    @classmethod
+    def from_config_file(cls, config_path: str) -> "Pipeline":
+        """Create pipeline from a JSON config file
+
+        Args:
+            config_path (str): path of JSON config file
+
+        Returns:
+            Pipeline: pipeline configured by the file
+        """
+        with open(config_path) as f:
+            config = json.load(f)
+
+        return cls(config, config_path)
+
+    def run(self) -> dict:
+        """Run every stage and write the run report
+
+        Returns:
+            dict: run report
+        """
+        started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+
+        ticker_index = self.run_stage("ticker_load", self.load_tickers)
+        reddit_data = self.create_reddit_data(ticker_index)
+        model = self.create_model()
+        reddit_store = RedditStore(self.config["storage"]["store_path"])
+        rollup_store = RollupStore(
+            self.config["storage"]["rollup_path"],
+            self.config["storage"].get("rollup_key_path"),
+        )
+
+        try:
+            if self.config["reddit"].get("stream", False):
+                chunk_size = self.config["reddit"]["chunk_size"]
+                chunks = reddit_data.extract_data_chunks(chunk_size)
+                while True:
+                    data = self.run_stage("scrape", next, chunks, None)
+                    if data is None:
+                        break
+                    data = self.process(data, reddit_data, model)
+                    self.run_stage(
+                        "persist", self.persist, data, reddit_store, rollup_store
+                    )
+            else:
+                data = self.run_stage("scrape", reddit_data.extract_data)
+                data = self.process(data, reddit_data, model)
+                self.run_stage(
+                    "persist", self.persist, data, reddit_store, rollup_store
+                )
+            rollup_store.save()
+            reddit_data.commit_checkpoint()
+        finally:
+            if hasattr(model, "close"):
+                model.close()
+
+        report = {
+            "run_id": self.run_id,
+            "started_at": started_at,
+            "config_path": self.config_path,
+            "wall_time_s": round(time.perf_counter() - start, 6),
+            "stages": [stage.to_dict() for stage in self.finish_stages()],
+        }
+        cache = getattr(model, "cache", None)
+        if cache is not None:
+            report["prediction_cache"] = cache.stats()
+        token_cache = getattr(model, "token_cache", None)
+        if token_cache is not None:
+            report["token_cache"] = token_cache.stats()
+        if reddit_data.comment_expander is not None:
+            report["comment_expansion"] = reddit_data.comment_expander.summary()
+        if isinstance(reddit_data, ArchiveData):
+            report["archive"] = reddit_data.summary()
+        self.write_report(report)
+
+        return report
+
+    def process(
+        self, data: pd.DataFrame, reddit_data: RedditData, model
+    ) -> pd.DataFrame:
+        """Run transform, clean, extract and infer stages on extracted data
+
+        Args:
+            data (pd.DataFrame): DataFrame with initial_col_names columns
+            reddit_data (RedditData): reddit data used to process data
+            model (Model): model used to predict sentiment
+
+        Returns:
+            pd.DataFrame: processed DataFrame with sentiment_score column
+        """
+        data = self.run_stage("transform", reddit_data.transform_data, data)
+        data = self.run_stage("clean", reddit_data.remove_unwanted_char, data)
+        data = self.run_stage("extract", reddit_data.extract_ticker, data)
+        data = self.run_stage("infer", self.infer, data, model)
+
+        return data
+
+    def run_stage(self, name: str, func, *args):
+        """Call func with args and record the measurements of the call under
+        stage name. Rows in is the length of the first argument, rows out the
+        length of the return value
+
+        Args:
+            name (str): name of stage
+            func (callable): function running the stage
+
+        Returns:
+            object: return value of func
+        """
+        stage = self.stages[name]
+        if self.profile_dir is not None and stage.profile is None:
+            stage.profile = cProfile.Profile()
+        if self.trace_memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        if stage.profile is not None:
+            stage.profile.enable()
+        try:
+            result = func(*args)
+        finally:
+            if stage.profile is not None:
+                stage.profile.disable()
+            stage.wall_time += time.perf_counter() - start
+            stage.calls += 1
+            if self.trace_memory:
+                traced_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+                stage.peak_traced_mb = round(
+                    max(stage.peak_traced_mb or 0.0, traced_mb), 2
+                )
+            # ru_maxrss is in kilobytes on Linux
+            rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            stage.peak_rss_mb = max(stage.peak_rss_mb, rss_mb)
+
+        if args and hasattr(args[0], "__len__"):
+            stage.rows_in += len(args[0])
+        if hasattr(result, "__len__"):
+            stage.rows_out += len(result)
+
+        return result
+
+    def finish_stages(self) -> list:
+        """Dump profiles of profiled stages
+
+        Returns:
+            list: StageReport of every stage that was run
+        """
+        stages = [stage for stage in self.stages.values() if stage.calls > 0]
+        for stage in stages:
+            if stage.profile is not None:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stage.profile_path = os.path.join(
+                    self.profile_dir, "{}-{}.prof".format(self.run_id, stage.name)
+                )
+                stage.profile.dump_stats(stage.profile_path)
+
+        return stages
+
+    def write_report(self, report: dict) -> None:
+        """Write run report as JSON into report_dir, if set
+
+        Args:
+            report (dict): run report
+        """
+        if self.report_dir is None:
+            return
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, "{}.json".format(self.run_id))
+        with open(path, "w") as f:
+            json.dump(report, f, indent=4)
+
+    def load_tickers(self) -> TickerIndex:
+        """Load ticker index
+
+        Returns:
+            TickerIndex: index of ticker symbols
+        """
+        ticker_config = self.config["ticker"]
+        ticker_data = TickerData(
+            ticker_config["csv_path_list"],
+            ticker_config["exception_list"],
+            ticker_config.get("cache_path"),
+            ticker_config.get("word_list_path"),
+        )
+
+        return ticker_data.create_data()
+
+    def create_reddit_data(self, ticker_index: TickerIndex) -> RedditData:
+        """Create RedditData from reddit config, or ArchiveData reading dump
+        files if an archive config is set
+
+        Args:
+            ticker_index (TickerIndex): index of ticker symbols
+
+        Returns:
+            RedditData: reddit data class to extract and preprocess data
+        """
+        reddit_config = self.config["reddit"]
+        archive_config = self.config.get("archive")
+        if archive_config:
+            return ArchiveData(
+                archive_config["submission_paths"],
+                archive_config["comment_paths"],
+                reddit_config["subreddits"],
+                ticker_index,
+                start_utc=archive_config.get("start_utc"),
+                end_utc=archive_config.get("end_utc"),
+                num_workers=archive_config.get("num_workers", 1),
+            )
+
+        # praw is slow to import, so only import it once it is needed
+        import praw
+
+        checkpoint_store = None
+        if reddit_config.get("incremental", False):
+            checkpoint_store = CheckpointStore(reddit_config["checkpoint_path"])
+
+        # Comment trees are expanded fully unless an expansion budget is set
+        comment_expander = None
+        expansion_config = reddit_config.get("expansion")
+        if expansion_config:
+            budget = ExpansionBudget(
+                expansion_config.get("max_requests"),
+                expansion_config.get("max_seconds"),
+            )
+            comment_expander = CommentExpander(
+                expansion_config.get("max_more_per_submission"),
+                expansion_config.get("max_depth"),
+                budget,
+            )
+
+        # praw.Reddit is not thread safe, so each worker thread gets its own
+        site_name = reddit_config.get("site_name", "DEFAULT")
+        max_workers = reddit_config.get("max_workers", 1)
+        create_reddit = partial(praw.Reddit, site_name) if max_workers > 1 else None
+
+        return RedditData(
+            praw.Reddit(site_name),
+            reddit_config["subreddits"],
+            reddit_config["num_posts"],
+            ticker_index,
+            max_workers=max_workers,
+            checkpoint_store=checkpoint_store,
+            comment_expander=comment_expander,
+            create_reddit=create_reddit,
+            refresh_seconds=reddit_config.get("refresh_seconds", 86400.0),
+        )
+
+    def create_model(self):
+        """Create model from model config. A ShardedModel is created if
+        num_workers is more than 1, otherwise a Model with a prediction cache
+
+        Returns:
+            Model: model used to predict sentiment
+        """
+        model_config = self.config["model"]
+        backend = model_config.get("backend", "pytorch")
+        num_workers = model_config.get("num_workers", 1)
+        if num_workers > 1:
+            from model.sharded_model import ShardedModel
+
+            return ShardedModel(
+                model_config["model_name"],
+                model_config["batch_size"],
+                num_workers,
+                backend=backend,
+            )
+
+        from model.model import Model
+
+        cache = PredictionCache(
+            model_config.get("cache_size", 100000), model_config.get("cache_path")
+        )
+        token_cache = None
+        if model_config.get("token_cache_dir"):
+            token_cache = TokenCache(model_config["token_cache_dir"])
+
+        return Model(
+            model_config["model_name"],
+            model_config["batch_size"],
+            cache=cache,
+            backend=backend,
+            token_cache=token_cache,
+        )
+
+    def infer(self, data: pd.DataFrame, model) -> pd.DataFrame:
+        """Predict sentiment of every row
+
+        Args:
+            data (pd.DataFrame): processed DataFrame
+            model (Model): model used to predict sentiment
+
+        Returns:
+            pd.DataFrame: DataFrame with sentiment_score column added, the
+                        predicted label 1=positive 0=negative
+        """
+        data["sentiment_score"] = model.predict(list(data["body"]))
+
+        return data
+
+    def persist(
+        self, data: pd.DataFrame, reddit_store: RedditStore, rollup_store: RollupStore
+    ) -> pd.DataFrame:
+        """Write data into the reddit store and update rollups. Rollups are
+        saved and the checkpoint committed once every chunk is persisted
+
+        Args:
+            data (pd.DataFrame): DataFrame with sentiment_score column
+            reddit_store (RedditStore): store of reddit data
+            rollup_store (RollupStore): store of ticker rollups
+
+        Returns:
+            pd.DataFrame: persisted DataFrame
+        """
+        # New rows replace rows of re-fetched content when read from the store,
+        # and rollups skip rows already added
+        reddit_store.write(data)
+        rollup_store.update(data)
+
+        return data
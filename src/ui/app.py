@@ -1,12 +1,26 @@
+import json
+import os
+import sys
+
 import streamlit as st
-import numpy as np
-import pandas as pd
+
+from data_aggregation.rollup_store import RollupStore, GRANULARITIES
+
+
+# Run from repo root: PYTHONPATH=src streamlit run src/ui/app.py [-- config.json]
+config_path = sys.argv[1] if len(sys.argv) > 1 else "config.json"
+with open(config_path) as config_file:
+    rollup_path = json.load(config_file)["storage"]["rollup_path"]
+
+
+@st.cache(allow_output_mutation=True)
+def load_rollup_store(path: str, modified_time: float) -> RollupStore:
+    # modified_time is part of the cache key, so rollups reload when updated
+    return RollupStore(path)
 
 
-data = pd.read_csv("data/reddit_data.csv")
-data["datetime"] = pd.to_datetime(data["datetime"])
-data = data.set_index("datetime")
-top_five_tickers = list(data["ticker"].value_counts().index[:5])
+rollup_store = load_rollup_store(rollup_path, os.path.getmtime(rollup_path))
+top_five_tickers = rollup_store.top_tickers(5)
 
 
 st.title("Reddit Sentiments")
@@ -14,9 +28,9 @@ st.title("Reddit Sentiments")
 option = st.sidebar.selectbox(
     "Which ticker would you like to analyse?", top_five_tickers
 )
-option_2 = st.sidebar.selectbox("Duration?", ["1hr", "12hr", "24hr", "3days", "7days"])
+option_2 = st.sidebar.selectbox("Duration?", list(GRANULARITIES))
 
 
-chart_data = data.groupby("ticker").resample("3H")["score"].sum()[option]
+chart_data = rollup_store.lookup(option, option_2)["score"]
 
-st.line_chart(chart_data)
\ No newline at end of file
+st.line_chart(chart_data)